@@ -3,11 +3,17 @@ Data Analysis Layer
 Centralized analytics that issue SQL queries to calculate metrics
 """
 import sqlite3
-from typing import Dict, List, Any, Optional
-from datetime import datetime, timedelta, timezone
+from contextlib import contextmanager
+from typing import Dict, List, Any, Optional, Tuple, Union
+from datetime import date, datetime, timedelta, timezone
 from dataclasses import dataclass
 
 
+def _now(tz: timezone) -> datetime:
+    """Current time in the given timezone - the single clock read, so tests can pin it"""
+    return datetime.now(tz)
+
+
 @dataclass
 class MetricResult:
     """Data class for metric results"""
@@ -35,23 +41,49 @@ class ServiceMetrics:
 class IncidentAnalytics:
     """Centralized data analysis layer using SQL queries for metrics calculation"""
     
-    def __init__(self, db_path: str = "incidents_v2.db"):
-        self.db_path = db_path
+    def __init__(self, db_path: Union[str, sqlite3.Connection] = "incidents_v2.db"):
+        # Accept either a database path or an already-open connection shared by all queries
+        if isinstance(db_path, sqlite3.Connection):
+            self.db_path = None
+            self._conn = db_path
+        else:
+            self.db_path = db_path
+            self._conn = None
         self.utc_minus_7 = timezone(timedelta(hours=-7))
     
+    @contextmanager
+    def _connect(self):
+        """Yield the shared connection if one was provided, otherwise open one per query"""
+        if self._conn is not None:
+            yield self._conn
+        else:
+            with sqlite3.connect(self.db_path, uri=self.db_path.startswith('file:')) as conn:
+                yield conn
+    
+    def _date_range(self, days: int) -> Tuple[str, str]:
+        """Half-open [start, end) bounds covering the last X days through today in UTC-7
+        
+        Every last-X-days method uses these bounds: today plus the X days before it, matching
+        IncidentDatabase.get_incidents_last_x_days.
+        
+        Compared against the generated created_date_utc_m7 column (each incident's UTC-7
+        calendar date), which IncidentDatabase indexes; the per-day queries group on that
+        same column, so every bucket they return falls inside the bounds.
+        """
+        today = _now(self.utc_minus_7).date()
+        return (today - timedelta(days=days)).isoformat(), (today + timedelta(days=1)).isoformat()
+    
     def get_total_incidents_last_x_days(self, days: int = 7) -> MetricResult:
         """Get total number of incidents in the last X days"""
-        now_utc7 = datetime.now(self.utc_minus_7)
-        start_date = (now_utc7.date() - timedelta(days=days)).isoformat()
-        end_date = now_utc7.date().isoformat()
+        start_date, end_date = self._date_range(days)
         
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
             
             cursor.execute("""
                 SELECT COUNT(*) 
                 FROM incidents 
-                WHERE DATE(created_at) BETWEEN ? AND ?
+                WHERE created_date_utc_m7 >= ? AND created_date_utc_m7 < ?
             """, (start_date, end_date))
             
             result = cursor.fetchone()
@@ -65,17 +97,15 @@ class IncidentAnalytics:
     
     def get_triggered_incidents_last_x_days(self, days: int = 7) -> MetricResult:
         """Get total triggered incidents in the last X days"""
-        now_utc7 = datetime.now(self.utc_minus_7)
-        start_date = (now_utc7.date() - timedelta(days=days)).isoformat()
-        end_date = now_utc7.date().isoformat()
+        start_date, end_date = self._date_range(days)
         
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
             
             cursor.execute("""
                 SELECT COUNT(*) 
                 FROM incidents 
-                WHERE DATE(created_at) BETWEEN ? AND ?
+                WHERE created_date_utc_m7 >= ? AND created_date_utc_m7 < ?
                 AND status IN ('triggered', 'acknowledged')
             """, (start_date, end_date))
             
@@ -90,17 +120,15 @@ class IncidentAnalytics:
     
     def get_resolved_incidents_last_x_days(self, days: int = 7) -> MetricResult:
         """Get total resolved incidents in the last X days"""
-        now_utc7 = datetime.now(self.utc_minus_7)
-        start_date = (now_utc7.date() - timedelta(days=days)).isoformat()
-        end_date = now_utc7.date().isoformat()
+        start_date, end_date = self._date_range(days)
         
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
             
             cursor.execute("""
                 SELECT COUNT(*) 
                 FROM incidents 
-                WHERE DATE(created_at) BETWEEN ? AND ?
+                WHERE created_date_utc_m7 >= ? AND created_date_utc_m7 < ?
                 AND status = 'resolved'
             """, (start_date, end_date))
             
@@ -115,17 +143,15 @@ class IncidentAnalytics:
     
     def get_escalated_incidents_last_x_days(self, days: int = 7) -> MetricResult:
         """Get total escalated incidents in the last X days"""
-        now_utc7 = datetime.now(self.utc_minus_7)
-        start_date = (now_utc7.date() - timedelta(days=days)).isoformat()
-        end_date = now_utc7.date().isoformat()
+        start_date, end_date = self._date_range(days)
         
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
             
             cursor.execute("""
                 SELECT COUNT(*) 
                 FROM incidents 
-                WHERE DATE(created_at) BETWEEN ? AND ?
+                WHERE created_date_utc_m7 >= ? AND created_date_utc_m7 < ?
                 AND is_escalated = 1
             """, (start_date, end_date))
             
@@ -150,17 +176,15 @@ class IncidentAnalytics:
     
     def get_ccoe_resolved_incidents_last_x_days(self, days: int = 7) -> MetricResult:
         """Get number of incidents resolved by CCOE in the last X days"""
-        now_utc7 = datetime.now(self.utc_minus_7)
-        start_date = (now_utc7.date() - timedelta(days=days)).isoformat()
-        end_date = now_utc7.date().isoformat()
+        start_date, end_date = self._date_range(days)
         
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
             
             cursor.execute("""
                 SELECT COUNT(*) 
                 FROM incidents 
-                WHERE DATE(created_at) BETWEEN ? AND ?
+                WHERE created_date_utc_m7 >= ? AND created_date_utc_m7 < ?
                   AND resolved_by_ccoe = 1
             """, (start_date, end_date))
             
@@ -174,17 +198,15 @@ class IncidentAnalytics:
     
     def get_infrastructure_caused_incidents_last_x_days(self, days: int = 7) -> MetricResult:
         """Get number of incidents caused by infrastructure issues in the last X days"""
-        now_utc7 = datetime.now(self.utc_minus_7)
-        start_date = (now_utc7.date() - timedelta(days=days)).isoformat()
-        end_date = now_utc7.date().isoformat()
+        start_date, end_date = self._date_range(days)
         
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
             
             cursor.execute("""
                 SELECT COUNT(*) 
                 FROM incidents 
-                WHERE DATE(created_at) BETWEEN ? AND ?
+                WHERE created_date_utc_m7 >= ? AND created_date_utc_m7 < ?
                   AND caused_by_infra IS NOT NULL 
                   AND caused_by_infra != ''
             """, (start_date, end_date))
@@ -197,16 +219,11 @@ class IncidentAnalytics:
                 period_days=days
             )
     
-    def get_service_metrics_last_x_days(self, days: int = 7) -> List[ServiceMetrics]:
-        """Get metrics broken down by service for the last X days"""
-        now_utc7 = datetime.now(self.utc_minus_7)
-        start_date = (now_utc7.date() - timedelta(days=days)).isoformat()
-        end_date = now_utc7.date().isoformat()
+    def _query_service_metrics(self, days: int, service_id: Optional[str] = None) -> List[ServiceMetrics]:
+        """Compute every per-service metric in one aggregate query, optionally for a single service"""
+        start_date, end_date = self._date_range(days)
         
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            
-            cursor.execute("""
+        query = """
                 SELECT 
                     service_id,
                     service_name,
@@ -217,10 +234,23 @@ class IncidentAnalytics:
                     SUM(CASE WHEN resolved_by_ccoe = 1 THEN 1 ELSE 0 END) as ccoe_resolved_incidents,
                     SUM(CASE WHEN caused_by_infra IS NOT NULL AND caused_by_infra != '' THEN 1 ELSE 0 END) as infrastructure_caused_incidents
                 FROM incidents 
-                WHERE DATE(created_at) BETWEEN ? AND ?
+                WHERE created_date_utc_m7 >= ? AND created_date_utc_m7 < ?
+            """
+        params = [start_date, end_date]
+        
+        if service_id:
+            query += " AND service_id = ?"
+            params.append(service_id)
+        
+        query += """
                 GROUP BY service_id, service_name
                 ORDER BY total_incidents DESC
-            """, (start_date, end_date))
+            """
+        
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute(query, params)
             
             results = []
             for row in cursor.fetchall():
@@ -241,25 +271,47 @@ class IncidentAnalytics:
             
             return results
     
+    def get_service_metrics_last_x_days(self, days: int = 7) -> List[ServiceMetrics]:
+        """Get metrics broken down by service for the last X days"""
+        return self._query_service_metrics(days)
+    
+    def get_all_services_summary(self, days: int = 7) -> List[ServiceMetrics]:
+        """Get metrics for every service with incidents in the last X days (same as get_service_metrics_last_x_days)"""
+        return self.get_service_metrics_last_x_days(days)
+    
+    def get_service_metrics(self, service_id: str, days: int = 7) -> ServiceMetrics:
+        """Get all metrics for one service in the last X days with a single aggregate query"""
+        results = self._query_service_metrics(days, service_id)
+        if results:
+            return results[0]
+        
+        return ServiceMetrics(
+            service_id=service_id,
+            service_name="",
+            total_incidents=0,
+            triggered_incidents=0,
+            resolved_incidents=0,
+            escalated_incidents=0,
+            escalation_rate=0.0
+        )
+    
     def get_daily_incident_trend_last_x_days(self, days: int = 7) -> List[Dict[str, Any]]:
         """Get daily incident counts for trend analysis"""
-        now_utc7 = datetime.now(self.utc_minus_7)
-        start_date = (now_utc7.date() - timedelta(days=days)).isoformat()
-        end_date = now_utc7.date().isoformat()
+        start_date, end_date = self._date_range(days)
         
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
             
             cursor.execute("""
                 SELECT 
-                    DATE(created_at) as incident_date,
+                    created_date_utc_m7 as incident_date,
                     COUNT(*) as total_incidents,
                     SUM(CASE WHEN status IN ('triggered', 'acknowledged') THEN 1 ELSE 0 END) as triggered_incidents,
                     SUM(CASE WHEN status = 'resolved' THEN 1 ELSE 0 END) as resolved_incidents,
                     SUM(CASE WHEN is_escalated = 1 THEN 1 ELSE 0 END) as escalated_incidents
                 FROM incidents 
-                WHERE DATE(created_at) BETWEEN ? AND ?
-                GROUP BY DATE(created_at)
+                WHERE created_date_utc_m7 >= ? AND created_date_utc_m7 < ?
+                GROUP BY created_date_utc_m7
                 ORDER BY incident_date DESC
             """, (start_date, end_date))
             
@@ -277,6 +329,59 @@ class IncidentAnalytics:
             
             return results
     
+    def get_daily_incident_counts(self, days: int = 7) -> List[Dict[str, Any]]:
+        """Get total and escalated incident counts per UTC-7 day for the last X days"""
+        start_date, end_date = self._date_range(days)
+        
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            
+            # Bucket by the UTC-7 calendar day in SQL so only one row per day is returned
+            cursor.execute("""
+                SELECT 
+                    created_date_utc_m7 as incident_date,
+                    COUNT(*) as total,
+                    SUM(CASE WHEN is_escalated = 1 THEN 1 ELSE 0 END) as escalated
+                FROM incidents 
+                WHERE created_date_utc_m7 >= ? AND created_date_utc_m7 < ?
+                GROUP BY created_date_utc_m7
+                ORDER BY incident_date
+            """, (start_date, end_date))
+            
+            return [
+                {'date': date, 'total': total, 'escalated': escalated}
+                for date, total, escalated in cursor.fetchall()
+            ]
+    
+    def get_incidents_by_service_for_calendar(self, service_id: str, year: int, month: int) -> Dict[str, List[Dict[str, Any]]]:
+        """Get a service's incidents for one month, keyed by UTC-7 date (YYYY-MM-DD)"""
+        month_start = date(year, month, 1)
+        next_month = date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)
+        
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute("""
+                SELECT 
+                    created_date_utc_m7 as incident_date,
+                    id, title, status, is_escalated
+                FROM incidents 
+                WHERE service_id = ?
+                  AND created_date_utc_m7 >= ? AND created_date_utc_m7 < ?
+                ORDER BY created_date_utc_m7, created_at
+            """, (service_id, month_start.isoformat(), next_month.isoformat()))
+            
+            calendar_data: Dict[str, List[Dict[str, Any]]] = {}
+            for incident_date, incident_id, title, status, is_escalated in cursor.fetchall():
+                calendar_data.setdefault(incident_date, []).append({
+                    'id': incident_id,
+                    'title': title,
+                    'status': status,
+                    'is_escalated': bool(is_escalated)
+                })
+            
+            return calendar_data
+    
     def get_summary_metrics(self, days: int = 7) -> Dict[str, Any]:
         """Get comprehensive summary metrics for the last X days"""
         total_metric = self.get_total_incidents_last_x_days(days)
@@ -4,198 +4,324 @@ Centralized database operations for storing and retrieving Incident objects
 """
 import sqlite3
 import os
+import queue
+import threading
+import weakref
+from contextlib import contextmanager
 from typing import List, Optional
 from datetime import datetime, timedelta, timezone
 from incident_v2 import Incident
 
 
+# Timestamps are stored as ISO-8601 text. Registered once at import: datetimes bind directly
+# and TIMESTAMP columns come back parsed on connections opened with PARSE_DECLTYPES
+# (legacy rows may hold '' for a missing timestamp, which reads back as None)
+sqlite3.register_adapter(datetime, datetime.isoformat)
+sqlite3.register_converter("TIMESTAMP", lambda value: datetime.fromisoformat(value.decode()) if value else None)
+
+
+# Per-connection tuning (SQLite pragmas other than journal_mode do not persist in the file)
+CONNECTION_PRAGMAS = (
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-20000",      # ~20 MB page cache
+    "PRAGMA mmap_size=134217728",    # 128 MB memory-mapped I/O
+)
+
+
+# Columns written on every store, in parameter order
+INCIDENT_WRITE_COLUMNS = (
+    'id', 'title', 'status', 'service_id', 'service_name', 'created_at', 'resolved_at',
+    'acknowledged_at', 'is_escalated', 'escalation_policy_id', 'escalation_policy_name',
+    'urgency', 'priority', 'description', 'resolved_by_ccoe', 'caused_by_infra', 'updated_at'
+)
+
+# UTC-7 calendar date of created_at. Timestamps with an offset (or Z) are shifted to UTC-7;
+# naive ones are already UTC-7 (as in Incident.get_date_str_utc_minus_7), so take their date as-is
+CREATED_DATE_UTC_M7_SQL = (
+    "CASE WHEN created_at GLOB '*[+-][0-9][0-9]:[0-9][0-9]' OR created_at LIKE '%Z' "
+    "THEN date(created_at, '-7 hours') ELSE substr(created_at, 1, 10) END"
+)
+
+# Columns that older databases may lack, with the definitions ALTER TABLE adds them with.
+# ALTER TABLE needs constant defaults (so updated_at has none) and can only add VIRTUAL
+# generated columns; the index on created_date_utc_m7 stores its values anyway.
+MIGRATION_COLUMNS = (
+    ('resolved_at', 'TIMESTAMP'),
+    ('acknowledged_at', 'TIMESTAMP'),
+    ('is_escalated', 'BOOLEAN NOT NULL DEFAULT 0'),
+    ('escalation_policy_id', 'TEXT'),
+    ('escalation_policy_name', 'TEXT'),
+    ('urgency', "TEXT DEFAULT 'low'"),
+    ('priority', 'TEXT'),
+    ('description', 'TEXT'),
+    ('resolved_by_ccoe', 'BOOLEAN NOT NULL DEFAULT 0'),
+    ('caused_by_infra', 'TEXT'),
+    ('updated_at', 'TIMESTAMP'),
+    ('created_date_utc_m7', f"TEXT GENERATED ALWAYS AS ({CREATED_DATE_UTC_M7_SQL}) VIRTUAL"),
+)
+
+# Incidents table, clustered on its TEXT primary key (WITHOUT ROWID) so a lookup by id is one
+# b-tree search instead of id index -> rowid -> table
+CREATE_INCIDENTS_TABLE_SQL = f"""
+    CREATE TABLE IF NOT EXISTS incidents (
+        id TEXT PRIMARY KEY,
+        title TEXT NOT NULL,
+        status TEXT NOT NULL,
+        service_id TEXT NOT NULL,
+        service_name TEXT NOT NULL,
+        created_at TIMESTAMP NOT NULL,
+        resolved_at TIMESTAMP,
+        acknowledged_at TIMESTAMP,
+        is_escalated BOOLEAN NOT NULL DEFAULT 0,
+        escalation_policy_id TEXT,
+        escalation_policy_name TEXT,
+        urgency TEXT DEFAULT 'low',
+        priority TEXT,
+        description TEXT,
+        resolved_by_ccoe BOOLEAN NOT NULL DEFAULT 0,
+        caused_by_infra TEXT,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        created_date_utc_m7 TEXT GENERATED ALWAYS AS ({CREATED_DATE_UTC_M7_SQL}) VIRTUAL
+    ) WITHOUT ROWID
+"""
+
+# Indexes on the incidents table. Date-range filters (here and in analytics_v2) go through the
+# two created_date_utc_m7 indexes; per-service reads seek service_id first. Only stable key
+# columns are indexed so an upsert does not rewrite unchanged entries.
+CREATE_INCIDENT_INDEXES_SQL = (
+    "CREATE INDEX IF NOT EXISTS idx_incidents_service_created ON incidents(service_id, created_at)",
+    "CREATE INDEX IF NOT EXISTS idx_incidents_status ON incidents(status)",
+    "CREATE INDEX IF NOT EXISTS idx_incidents_escalated ON incidents(is_escalated)",
+    "CREATE INDEX IF NOT EXISTS idx_incidents_created_date ON incidents(DATE(created_at))",
+    "CREATE INDEX IF NOT EXISTS idx_incidents_created_date_m7 ON incidents(created_date_utc_m7, service_id)",
+    "CREATE INDEX IF NOT EXISTS idx_incidents_service_date_m7 ON incidents(service_id, created_date_utc_m7)",
+)
+
+# Native UPSERT: an existing row is updated in place instead of deleted and reinserted
+# (INSERT OR REPLACE), so index entries on unchanged columns are not rewritten
+UPSERT_INCIDENT_SQL = f"""
+    INSERT INTO incidents ({', '.join(INCIDENT_WRITE_COLUMNS)})
+    VALUES ({', '.join('?' * len(INCIDENT_WRITE_COLUMNS))})
+    ON CONFLICT(id) DO UPDATE SET
+        {', '.join(f'{col}=excluded.{col}' for col in INCIDENT_WRITE_COLUMNS[1:])}
+"""
+
+# Read statements, kept as fixed strings so every call hits the connection's statement cache
+SELECT_BY_RANGE_SQL = """
+    SELECT * FROM incidents 
+    WHERE created_date_utc_m7 BETWEEN ? AND ?
+    ORDER BY created_at DESC
+"""
+
+SELECT_BY_RANGE_AND_SERVICE_SQL = """
+    SELECT * FROM incidents 
+    WHERE created_date_utc_m7 BETWEEN ? AND ? AND service_id = ?
+    ORDER BY created_at DESC
+"""
+
+# Prepared statements kept per connection (the sqlite3 default is 128)
+STATEMENT_CACHE_SIZE = 256
+
+
+def _close_connections(connections: List[sqlite3.Connection]) -> None:
+    """Close every connection (finalizer callback, so it must not reference the instance)"""
+    for conn in connections:
+        conn.close()
+
+
 class IncidentDatabase:
     """Centralized database access layer for Incident objects"""
     
-    def __init__(self, db_path: str = "incidents_v2.db"):
+    def __init__(self, db_path: str = "incidents_v2.db", network_mode: bool = False, readers: int = 2):
         self.db_path = db_path
+        # WAL needs shared memory, so keep the rollback journal on network filesystems
+        self.network_mode = network_mode
         self.utc_minus_7 = timezone(timedelta(hours=-7))
+        
+        # One long-lived writer connection, serialized by a lock
+        self._conn = self._connect()
+        self._lock = threading.Lock()
+        
+        # Pool of read-only connections so queries do not queue behind the writer (WAL allows
+        # concurrent readers). Readers are opened on demand, up to `readers`, so a short-lived
+        # instance that runs one query only pays for one. The finalizer closes every connection
+        # in self._connections (readers are appended as they open) when the instance is garbage
+        # collected or at exit.
+        self._max_readers = max(readers, 1)
+        self._pool_lock = threading.Lock()  # Separate from the writer lock so reads never wait on writes
+        self._readers: "queue.Queue[sqlite3.Connection]" = queue.Queue()
+        self._connections = [self._conn]
+        self._finalizer = weakref.finalize(self, _close_connections, self._connections)
+        
         self._init_database()
     
+    def _connect(self, read_only: bool = False) -> sqlite3.Connection:
+        """Open a connection with the performance pragmas applied"""
+        # Readers run in autocommit mode: sqlite3 otherwise opens an implicit transaction before
+        # DML, and a reader left inside one keeps its read lock after the query finishes
+        conn = sqlite3.connect(self.db_path, check_same_thread=False,
+                               cached_statements=STATEMENT_CACHE_SIZE,
+                               detect_types=sqlite3.PARSE_DECLTYPES,
+                               isolation_level=None if read_only else "",
+                               uri=self.db_path.startswith('file:'))
+        if read_only:
+            conn.execute("PRAGMA query_only=true")
+        for pragma in CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        if not self.network_mode:
+            # With WAL, NORMAL only syncs at checkpoints and stays corruption-safe
+            conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+    
+    @contextmanager
+    def _connection(self):
+        """Hold the shared connection for one operation (rolled back if the operation raises)"""
+        with self._lock, self._conn:
+            yield self._conn
+    
+    @contextmanager
+    def _reader(self):
+        """Check out a read-only connection from the pool for one query"""
+        try:
+            conn = self._readers.get_nowait()
+        except queue.Empty:
+            conn = self._open_reader()
+        try:
+            yield conn
+        finally:
+            self._readers.put(conn)
+    
+    def _open_reader(self) -> sqlite3.Connection:
+        """Open another read-only connection, or wait for a pooled one once the pool is full"""
+        with self._pool_lock:
+            if not self._finalizer.alive:
+                raise sqlite3.ProgrammingError("Cannot operate on a closed database.")
+            if len(self._connections) - 1 < self._max_readers:
+                conn = self._connect(read_only=True)
+                self._connections.append(conn)
+                return conn
+        return self._readers.get()
+    
+    def close(self) -> None:
+        """Close the writer and reader connections (safe to call more than once)"""
+        self._finalizer()
+    
     def _init_database(self):
         """Initialize database with incidents table"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connection() as conn:
             cursor = conn.cursor()
             
-            # Create incidents table
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS incidents (
-                    id TEXT PRIMARY KEY,
-                    title TEXT NOT NULL,
-                    status TEXT NOT NULL,
-                    service_id TEXT NOT NULL,
-                    service_name TEXT NOT NULL,
-                    created_at TIMESTAMP NOT NULL,
-                    resolved_at TIMESTAMP,
-                    acknowledged_at TIMESTAMP,
-                    is_escalated BOOLEAN NOT NULL DEFAULT 0,
-                    escalation_policy_id TEXT,
-                    escalation_policy_name TEXT,
-                    urgency TEXT DEFAULT 'low',
-                    priority TEXT,
-                    description TEXT,
-                    resolved_by_ccoe BOOLEAN NOT NULL DEFAULT 0,
-                    caused_by_infra TEXT,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-            
-            # Add new columns if they don't exist (for database migration)
-            try:
-                cursor.execute("ALTER TABLE incidents ADD COLUMN resolved_by_ccoe BOOLEAN NOT NULL DEFAULT 0")
-            except sqlite3.OperationalError:
-                pass  # Column already exists
-                
-            try:
-                cursor.execute("ALTER TABLE incidents ADD COLUMN caused_by_infra TEXT")
-            except sqlite3.OperationalError:
-                pass  # Column already exists
+            # page_size only takes effect before the first table is created (and before WAL)
+            cursor.execute("PRAGMA page_size=32768")
+            if not self.network_mode:
+                cursor.execute("PRAGMA journal_mode=WAL")
             
-            # Create indexes for performance
-            cursor.execute("""
-                CREATE INDEX IF NOT EXISTS idx_incidents_service_created 
-                ON incidents(service_id, created_at)
-            """)
+            # Create incidents table, clustered on its TEXT primary key (WITHOUT ROWID)
+            cursor.execute(CREATE_INCIDENTS_TABLE_SQL)
             
-            cursor.execute("""
-                CREATE INDEX IF NOT EXISTS idx_incidents_status 
-                ON incidents(status)
-            """)
+            # Add new columns if they don't exist (for database migration)
+            self._migrate(conn)
             
-            cursor.execute("""
-                CREATE INDEX IF NOT EXISTS idx_incidents_escalated 
-                ON incidents(is_escalated)
-            """)
-            
-            cursor.execute("""
-                CREATE INDEX IF NOT EXISTS idx_incidents_created_date 
-                ON incidents(DATE(created_at))
-            """)
+            # Create indexes for performance (idx_incidents_covering held every column including
+            # updated_at, so every upsert rewrote it; idx_incidents_service_date_m7 replaces it)
+            cursor.execute("DROP INDEX IF EXISTS idx_incidents_covering")
+            for index_sql in CREATE_INCIDENT_INDEXES_SQL:
+                cursor.execute(index_sql)
             
             conn.commit()
             print(f"✅ Database initialized at {self.db_path}")
     
+    def _migrate(self, conn: sqlite3.Connection) -> None:
+        """Add every missing MIGRATION_COLUMNS column in one transaction (one schema change commit)"""
+        # table_xinfo, unlike table_info, also lists generated columns
+        existing = {row[1] for row in conn.execute("PRAGMA table_xinfo(incidents)")}
+        missing = [(column, definition) for column, definition in MIGRATION_COLUMNS if column not in existing]
+        if not missing:
+            return
+        
+        conn.execute("BEGIN")
+        for column, definition in missing:
+            conn.execute(f"ALTER TABLE incidents ADD COLUMN {column} {definition}")
+        conn.commit()
+        print(f"🔧 Migrated incidents table: added {', '.join(column for column, _ in missing)}")
+    
+    def _to_row(self, incident: Incident, updated_at: datetime) -> tuple:
+        """UPSERT parameters for an incident, in INCIDENT_WRITE_COLUMNS order (datetimes bound as-is)"""
+        return tuple(getattr(incident, column) for column in INCIDENT_WRITE_COLUMNS[:-1]) + (updated_at,)
+    
     def store_incident(self, incident: Incident) -> None:
-        """Store a single incident in the database (INSERT OR REPLACE)"""
-        with sqlite3.connect(self.db_path) as conn:
+        """Store a single incident in the database (insert, or update in place if the ID exists)"""
+        with self._connection() as conn:
             cursor = conn.cursor()
             
-            incident_data = incident.to_dict()
-            
             # Get current time in UTC-7
-            current_time_utc7 = datetime.now(self.utc_minus_7).isoformat()
+            current_time_utc7 = datetime.now(self.utc_minus_7)
             
-            cursor.execute("""
-                INSERT OR REPLACE INTO incidents 
-                (id, title, status, service_id, service_name, created_at, resolved_at, 
-                 acknowledged_at, is_escalated, escalation_policy_id, escalation_policy_name,
-                 urgency, priority, description, resolved_by_ccoe, caused_by_infra, updated_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                incident_data['id'],
-                incident_data['title'],
-                incident_data['status'],
-                incident_data['service_id'],
-                incident_data['service_name'],
-                incident_data['created_at'],
-                incident_data['resolved_at'],
-                incident_data['acknowledged_at'],
-                incident_data['is_escalated'],
-                incident_data['escalation_policy_id'],
-                incident_data['escalation_policy_name'],
-                incident_data['urgency'],
-                incident_data['priority'],
-                incident_data['description'],
-                incident_data['resolved_by_ccoe'],
-                incident_data['caused_by_infra'],
-                current_time_utc7
-            ))
+            cursor.execute(UPSERT_INCIDENT_SQL, self._to_row(incident, current_time_utc7))
             
             conn.commit()
     
     def store_incidents_batch(self, incidents: List[Incident]) -> int:
-        """Store multiple incidents in batch for better performance"""
+        """Store multiple incidents with one executemany in a single transaction"""
         if not incidents:
             return 0
         
-        stored_count = 0
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            
-            for incident in incidents:
-                try:
-                    incident_data = incident.to_dict()
-                    
-                    # Get current time in UTC-7
-                    current_time_utc7 = datetime.now(self.utc_minus_7).isoformat()
-                    
-                    cursor.execute("""
-                        INSERT OR REPLACE INTO incidents 
-                        (id, title, status, service_id, service_name, created_at, resolved_at, 
-                         acknowledged_at, is_escalated, escalation_policy_id, escalation_policy_name,
-                         urgency, priority, description, resolved_by_ccoe, caused_by_infra, updated_at)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    """, (
-                        incident_data['id'],
-                        incident_data['title'],
-                        incident_data['status'],
-                        incident_data['service_id'],
-                        incident_data['service_name'],
-                        incident_data['created_at'],
-                        incident_data['resolved_at'],
-                        incident_data['acknowledged_at'],
-                        incident_data['is_escalated'],
-                        incident_data['escalation_policy_id'],
-                        incident_data['escalation_policy_name'],
-                        incident_data['urgency'],
-                        incident_data['priority'],
-                        incident_data['description'],
-                        incident_data['resolved_by_ccoe'],
-                        incident_data['caused_by_infra'],
-                        current_time_utc7
-                    ))
-                    stored_count += 1
-                    
-                except Exception as e:
-                    print(f"❌ Failed to store incident {incident.id}: {e}")
-            
+        # Get current time in UTC-7 (one timestamp for the whole batch)
+        current_time_utc7 = datetime.now(self.utc_minus_7)
+        
+        # Convert each incident on its own so one malformed element (None, or an object missing
+        # a column attribute) is reported and skipped instead of aborting the whole batch
+        rows = []
+        for incident in incidents:
+            try:
+                if incident.id is None:
+                    raise ValueError("missing incident ID")
+                rows.append(self._to_row(incident, current_time_utc7))
+            except (AttributeError, ValueError) as e:
+                print(f"❌ Failed to store incident {getattr(incident, 'id', None)}: {e}")
+        
+        with self._connection() as conn:
+            stored_count = self._store_rows_bisecting(conn, rows)
             conn.commit()
         
         print(f"💾 Stored {stored_count}/{len(incidents)} incidents in database")
         return stored_count
     
+    def _store_rows_bisecting(self, conn: sqlite3.Connection, rows: List[tuple]) -> int:
+        """Store rows under a savepoint; on a bad-row error roll it back and retry each half"""
+        if not rows:
+            return 0
+        
+        conn.execute("SAVEPOINT store_batch")
+        try:
+            conn.executemany(UPSERT_INCIDENT_SQL, rows)
+        except (sqlite3.IntegrityError, sqlite3.InterfaceError, sqlite3.ProgrammingError) as e:
+            # Constraint violations and values sqlite cannot bind are per-row problems
+            # Undo the rows this chunk already wrote, then narrow down to the offending row(s)
+            conn.execute("ROLLBACK TO store_batch")
+            conn.execute("RELEASE store_batch")
+            if len(rows) == 1:
+                print(f"❌ Failed to store incident {rows[0][0]}: {e}")
+                return 0
+            middle = len(rows) // 2
+            return self._store_rows_bisecting(conn, rows[:middle]) + self._store_rows_bisecting(conn, rows[middle:])
+        
+        conn.execute("RELEASE store_batch")
+        return len(rows)
+    
     def get_incidents_by_date_range(self, start_date: str, end_date: str, 
                                    service_id: Optional[str] = None) -> List[Incident]:
         """Get incidents within date range (dates in UTC-7 timezone)"""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
+        with self._reader() as conn:
             cursor = conn.cursor()
-            
-            query = """
-                SELECT * FROM incidents 
-                WHERE substr(created_at, 1, 10) BETWEEN ? AND ?
-            """
-            params = [start_date, end_date]
+            cursor.row_factory = Incident._from_row
             
             if service_id:
-                query += " AND service_id = ?"
-                params.append(service_id)
-            
-            query += " ORDER BY created_at DESC"
+                cursor.execute(SELECT_BY_RANGE_AND_SERVICE_SQL, (start_date, end_date, service_id))
+            else:
+                cursor.execute(SELECT_BY_RANGE_SQL, (start_date, end_date))
             
-            cursor.execute(query, params)
-            
-            incidents = []
-            for row in cursor.fetchall():
-                incident_data = dict(row)
-                incidents.append(Incident.from_dict(incident_data))
-            
-            return incidents
+            return cursor.fetchall()
     
     def get_incidents_last_x_days(self, days: int = 7, 
                                  service_id: Optional[str] = None) -> List[Incident]:
@@ -208,9 +334,9 @@ class IncidentDatabase:
     
     def get_escalated_incidents_last_x_days(self, days: int = 7) -> List[Incident]:
         """Get only escalated incidents from last X days"""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
+        with self._reader() as conn:
             cursor = conn.cursor()
+            cursor.row_factory = Incident._from_row
             
             now_utc7 = datetime.now(self.utc_minus_7)
             end_date = now_utc7.date().isoformat()
@@ -223,33 +349,24 @@ class IncidentDatabase:
                 ORDER BY created_at DESC
             """, (start_date, end_date))
             
-            incidents = []
-            for row in cursor.fetchall():
-                incident_data = dict(row)
-                incidents.append(Incident.from_dict(incident_data))
-            
-            return incidents
+            return cursor.fetchall()
     
     def get_incident_by_id(self, incident_id: str) -> Optional[Incident]:
         """Get a specific incident by its ID"""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
+        with self._reader() as conn:
             cursor = conn.cursor()
+            cursor.row_factory = Incident._from_row
             
             cursor.execute("""
                 SELECT * FROM incidents 
                 WHERE id = ?
             """, (incident_id,))
             
-            row = cursor.fetchone()
-            if row:
-                incident_data = dict(row)
-                return Incident.from_dict(incident_data)
-            return None
+            return cursor.fetchone()
     
     def get_all_service_ids(self) -> List[str]:
         """Get all unique service IDs in the database"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._reader() as conn:
             cursor = conn.cursor()
             
             cursor.execute("SELECT DISTINCT service_id FROM incidents")
@@ -259,7 +376,7 @@ class IncidentDatabase:
     
     def get_incident_count(self) -> int:
         """Get total number of incidents in database"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._reader() as conn:
             cursor = conn.cursor()
             
             cursor.execute("SELECT COUNT(*) FROM incidents")
@@ -272,7 +389,7 @@ class IncidentDatabase:
         now_utc7 = datetime.now(self.utc_minus_7)
         cutoff_date = (now_utc7.date() - timedelta(days=days)).isoformat()
         
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connection() as conn:
             cursor = conn.cursor()
             
             cursor.execute("""
@@ -2,12 +2,38 @@
 Incident Data Transfer Object
 Pure data class with no external dependencies - serves as DTO between API and Database layers
 """
-from dataclasses import dataclass
-from datetime import datetime
+from dataclasses import dataclass, fields
+from datetime import datetime, timezone, timedelta
+from functools import lru_cache
+from operator import itemgetter
 from typing import Optional, Dict, Any
 
 
-@dataclass
+UTC_MINUS_7 = timezone(timedelta(hours=-7))
+
+# Statuses as the PagerDuty API returns them (lowercase)
+_TRIGGERED_OR_ACKNOWLEDGED = frozenset({'triggered', 'acknowledged'})
+
+
+def _parse_timestamp(value) -> Optional[datetime]:
+    """Parse an ISO timestamp; values already converted by the sqlite3 TIMESTAMP converter pass through"""
+    if not value:
+        return None
+    if isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(value)
+
+
+@lru_cache(maxsize=4096)
+def _date_str_utc_minus_7(created_at: datetime) -> str:
+    """UTC-7 calendar date of a timestamp, memoized per timestamp value"""
+    # If the datetime is already timezone-aware, convert it; a naive one is assumed to be UTC-7
+    if created_at.tzinfo is not None:
+        created_at = created_at.astimezone(UTC_MINUS_7)
+    return created_at.date().isoformat()
+
+
+@dataclass(slots=True)
 class Incident:
     """
     Pure data transfer object representing a PagerDuty incident
@@ -54,9 +80,9 @@ class Incident:
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'Incident':
         """Create Incident from dictionary (e.g., from database)"""
-        created_at = datetime.fromisoformat(data['created_at'])
-        resolved_at = datetime.fromisoformat(data['resolved_at']) if data['resolved_at'] else None
-        acknowledged_at = datetime.fromisoformat(data['acknowledged_at']) if data['acknowledged_at'] else None
+        created_at = _parse_timestamp(data['created_at'])
+        resolved_at = _parse_timestamp(data['resolved_at'])
+        acknowledged_at = _parse_timestamp(data['acknowledged_at'])
         
         return cls(
             id=data['id'],
@@ -77,28 +103,52 @@ class Incident:
             caused_by_infra=data.get('caused_by_infra')
         )
     
+    @classmethod
+    def _from_row(cls, cursor, row: tuple) -> 'Incident':
+        """sqlite3 row_factory: bind fields by position through a column-index map cached per result shape"""
+        getter = _row_getter(cursor.description)
+        if getter is None:
+            # Legacy column set without the optional fields: fall back to the tolerant dict path
+            return cls.from_dict(dict(zip((column[0] for column in cursor.description), row)))
+        
+        (incident_id, title, status, service_id, service_name, created_at, resolved_at, acknowledged_at,
+         is_escalated, escalation_policy_id, escalation_policy_name, urgency, priority, description,
+         resolved_by_ccoe, caused_by_infra) = getter(row)
+        return cls(incident_id, title, status, service_id, service_name, _parse_timestamp(created_at),
+                   _parse_timestamp(resolved_at), _parse_timestamp(acknowledged_at), bool(is_escalated),
+                   escalation_policy_id, escalation_policy_name, urgency, priority, description,
+                   bool(resolved_by_ccoe), caused_by_infra)
+    
     def get_date_str_utc_minus_7(self) -> str:
         """Get incident date in UTC-7 timezone as string"""
-        from datetime import timezone, timedelta
-        
-        # If the datetime is already timezone-aware, use it directly
-        if self.created_at.tzinfo is not None:
-            # Convert to UTC-7 timezone
-            utc_minus_7 = timezone(timedelta(hours=-7))
-            local_time = self.created_at.astimezone(utc_minus_7)
-            return local_time.date().isoformat()
-        else:
-            # If naive datetime, assume it's already in UTC-7
-            return self.created_at.date().isoformat()
+        # Cached by timestamp value rather than on the instance, so reassigning created_at
+        # can never return a stale date
+        return _date_str_utc_minus_7(self.created_at)
     
     def is_triggered_or_acknowledged(self) -> bool:
         """Check if incident is in triggered or acknowledged state"""
-        return self.status.lower() in ['triggered', 'acknowledged']
+        # Exact match first so the common lowercase status needs no lower() allocation
+        status = self.status
+        return status in _TRIGGERED_OR_ACKNOWLEDGED or status.lower() in _TRIGGERED_OR_ACKNOWLEDGED
     
     def is_resolved(self) -> bool:
         """Check if incident is resolved"""
-        return self.status.lower() == 'resolved'
+        status = self.status
+        return status == 'resolved' or status.lower() == 'resolved'
     
     def is_caused_by_infrastructure(self) -> bool:
         """Check if incident is caused by infrastructure issue"""
-        return bool(self.caused_by_infra and self.caused_by_infra.strip())
\ No newline at end of file
+        return bool(self.caused_by_infra and self.caused_by_infra.strip())
+
+
+# Incident fields in declaration order (the order _from_row unpacks them)
+_INCIDENT_FIELDS = tuple(field.name for field in fields(Incident))
+
+
+@lru_cache(maxsize=32)
+def _row_getter(description: tuple) -> Optional[itemgetter]:
+    """itemgetter returning Incident fields in declaration order from rows shaped like description"""
+    positions = {column[0]: index for index, column in enumerate(description)}
+    if not positions.keys() >= set(_INCIDENT_FIELDS):
+        return None
+    return itemgetter(*(positions[name] for name in _INCIDENT_FIELDS))
\ No newline at end of file
@@ -23,11 +23,12 @@ class PagerDutyAPIClient:
         }
         # UTC-7 timezone for date calculations
         self.utc_minus_7 = timezone(timedelta(hours=-7))
+        # One session for all calls, so per-incident requests reuse pooled keep-alive connections
+        self.session = requests.Session()
     
     def load_services_from_config(self, config_path: str = "PagerDuty.yaml") -> tuple[List[str], Dict[str, str]]:
         """Load service IDs and names from PagerDuty.yaml configuration"""
-        with open(config_path, 'r') as file:
-            data = yaml.safe_load(file)
+        data = self._load_yaml(config_path)
         
         service_ids = []
         service_id_to_name = {}
@@ -41,6 +42,11 @@ class PagerDutyAPIClient:
         
         return service_ids, service_id_to_name
     
+    def _load_yaml(self, config_path: str) -> Dict[str, Any]:
+        """Read and parse a YAML file"""
+        with open(config_path, 'r') as file:
+            return yaml.safe_load(file)
+    
     def _extract_service_id(self, service_url: str) -> str:
         """Extract service ID from PagerDuty service URL"""
         path = urlparse(service_url).path
@@ -170,7 +176,7 @@ class PagerDutyAPIClient:
                 "sort_by": "created_at:desc"
             }
             
-            response = requests.get(url, headers=self.headers, params=params, timeout=1800)  # 30 minutes
+            response = self.session.get(url, headers=self.headers, params=params, timeout=1800)  # 30 minutes
             response.raise_for_status()
             
             data = response.json()
@@ -214,7 +220,7 @@ class PagerDutyAPIClient:
                 }
                 
                 # Use shorter timeout for individual requests (30 seconds)
-                response = requests.get(url, headers=self.headers, params=params, timeout=30)
+                response = self.session.get(url, headers=self.headers, params=params, timeout=30)
                 response.raise_for_status()
                 
                 log_entries = response.json().get("log_entries", [])
@@ -260,7 +266,7 @@ class PagerDutyAPIClient:
                 url = f"{self.base_url}/incidents/{incident_id}/custom_fields/values"
                 
                 # Use shorter timeout for individual requests (30 seconds)
-                response = requests.get(url, headers=self.headers, timeout=30)
+                response = self.session.get(url, headers=self.headers, timeout=30)
                 response.raise_for_status()
                 
                 custom_fields = response.json().get("custom_fields", [])
@@ -2,18 +2,49 @@
 Pytest configuration and shared fixtures for PagerDuty Incident Analytics tests
 """
 import pytest
-import tempfile
-import os
+import hashlib
 from datetime import datetime, timezone, timedelta
-from unittest.mock import patch
+from itertools import accumulate, repeat
+from unittest.mock import patch, mock_open
 import sqlite3
+import uuid
 
-# Add parent directory to path to import modules
+# Add parent directory to path to import modules. This runs once, when pytest
+# loads this conftest; it cannot live in pytest_configure because the imports
+# below need the path before any hook is called.
 import sys
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from pathlib import Path
 
+PAGERDUTY_DIR = str(Path(__file__).resolve().parent.parent)
+if PAGERDUTY_DIR not in sys.path:
+    sys.path.insert(0, PAGERDUTY_DIR)
+
+# Only lightweight modules are imported here; the database, analytics, API client (requests)
+# and YAML modules are imported inside the fixtures that use them, so collecting a subset of
+# the suite does not pay for them
 from incident_v2 import Incident
-from database_v2 import IncidentDatabase
+from test.fixtures.sample_pagerduty_data import SAMPLE_CONFIG_YAML
+from test.fixtures.test_database import TestDatabaseHelper, create_sample_test_incidents
+
+
+def pytest_addoption(parser):
+    parser.addoption("--runslow", action="store_true", default=False,
+                     help="run tests marked slow (granular duplicates of combined tests)")
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "slow: granular regression test, skipped unless --runslow is given")
+    config.addinivalue_line("markers", "integration: exercises the HTTP request path (deselect with -m 'not integration')")
+
+
+def pytest_collection_modifyitems(config, items):
+    """Skip tests marked slow unless --runslow is given"""
+    if config.getoption("--runslow"):
+        return
+    skip_slow = pytest.mark.skip(reason="needs --runslow option to run")
+    for item in items:
+        if "slow" in item.keywords:
+            item.add_marker(skip_slow)
 
 
 @pytest.fixture
@@ -22,6 +53,14 @@ def utc_minus_7():
     return timezone(timedelta(hours=-7))
 
 
+@pytest.fixture
+def frozen_now(monkeypatch):
+    """Pin the analytics clock to 2025-08-23 15:00 UTC without patching datetime globally"""
+    frozen = datetime(2025, 8, 23, 15, 0, 0, tzinfo=timezone.utc)
+    monkeypatch.setattr("analytics_v2._now", lambda tz: frozen.astimezone(tz))
+    return frozen
+
+
 @pytest.fixture
 def sample_incident_data(utc_minus_7):
     """Sample incident data for testing"""
@@ -55,68 +94,194 @@ def sample_incident(sample_incident_data):
 def sample_incidents(utc_minus_7):
     """Multiple sample incidents for testing"""
     base_time = datetime(2025, 8, 23, 10, 0, 0, tzinfo=utc_minus_7)
+    count = 5
+    
+    # Hourly timestamps (one extra for the last resolved_at) and 5-minute acknowledgement steps
+    hourly = list(accumulate(repeat(timedelta(hours=1), count), initial=base_time))
+    acknowledged = list(accumulate(repeat(timedelta(minutes=5), count - 1),
+                                   initial=base_time + timedelta(minutes=15)))
+    
+    # Hoist the class lookup and the per-row patterns out of the loop
+    _Incident = Incident
+    even_pat = tuple(i % 2 == 0 for i in range(count))
+    third_pat = tuple(i % 3 == 0 for i in range(count))
     
     incidents = []
-    for i in range(5):
-        incidents.append(Incident(
-            id=f'Q{i}ABC123DEF',
-            title=f'Test incident {i}',
-            status='resolved' if i % 2 == 0 else 'triggered',
-            service_id='PHMCGNE',
-            service_name='Test Service',
-            created_at=base_time + timedelta(hours=i),
-            resolved_at=base_time + timedelta(hours=i+1) if i % 2 == 0 else None,
-            acknowledged_at=base_time + timedelta(minutes=15+i*5),
-            is_escalated=i % 3 == 0,
-            escalation_policy_id='POLICY123',
-            escalation_policy_name='Default Escalation',
-            urgency='high' if i % 2 == 0 else 'low',
-            priority=f'P{i+1}',
-            description=f'Test incident {i} description',
-            resolved_by_ccoe=i % 2 == 0,
-            caused_by_infra='rheos' if i % 3 == 0 else None
+    for i in range(count):
+        even, third = even_pat[i], third_pat[i]
+        # Positional arguments follow the Incident field order
+        incidents.append(_Incident(
+            f'Q{i}ABC123DEF',
+            f'Test incident {i}',
+            'resolved' if even else 'triggered',
+            'PHMCGNE',
+            'Test Service',
+            hourly[i],
+            hourly[i+1] if even else None,
+            acknowledged[i],
+            third,
+            'POLICY123',
+            'Default Escalation',
+            'high' if even else 'low',
+            f'P{i+1}',
+            f'Test incident {i} description',
+            even,
+            'rheos' if third else None
         ))
     return incidents
 
 
+def _memory_db_uri() -> str:
+    """Unique in-memory database URI (shared cache, so every connection sees it)"""
+    return f"file:test_{uuid.uuid4().hex}?mode=memory&cache=shared"
+
+
 @pytest.fixture
 def temp_db():
-    """Temporary database for testing"""
-    with tempfile.NamedTemporaryFile(suffix='.db', delete=False) as f:
-        db_path = f.name
-    
-    yield db_path
+    """Temporary in-memory database URI for testing"""
+    uri = _memory_db_uri()
+    # A shared in-memory database only lives while a connection to it is open
+    anchor = sqlite3.connect(uri, uri=True)
+    yield uri
+    anchor.close()
+
+
+@pytest.fixture(scope="session")
+def sample_incidents_cached():
+    """Cached, shared tuple of analytics sample incidents (read-only)"""
+    return create_sample_test_incidents()
+
+
+@pytest.fixture(scope="session")
+def _template_conn(sample_incidents_cached):
+    """In-memory database with schema and sample incidents, built once per session"""
+    conn = sqlite3.connect(":memory:")
+    db_helper = TestDatabaseHelper(conn)
+    db_helper.create_schema()
+    db_helper.insert_sample_incidents(sample_incidents_cached)
+    yield conn
+    conn.close()
+
+
+@pytest.fixture
+def empty_db():
+    """Per-test in-memory database with only the schema, for tests that insert their own data"""
+    conn = sqlite3.connect(":memory:")
+    TestDatabaseHelper(conn).create_schema()
+    yield conn
+    conn.close()
+
+
+@pytest.fixture
+def analytics_factory(temp_db):
+    """Build IncidentAnalytics instances that all share one connection to temp_db for the test"""
+    from analytics_v2 import IncidentAnalytics
+    conn = sqlite3.connect(temp_db, uri=True, check_same_thread=False)
+    TestDatabaseHelper(conn).create_schema()
+    yield lambda: IncidentAnalytics(conn)
+    conn.close()
+
+
+@pytest.fixture(scope="module")
+def db_engine():
+    """IncidentDatabase with schema, indexes and connections built once per test module"""
+    from database_v2 import IncidentDatabase
+    uri = _memory_db_uri()
+    anchor = sqlite3.connect(uri, uri=True)
+    db = IncidentDatabase(uri)
+    yield db
+    db.close()
+    anchor.close()
+
+
+@pytest.fixture
+def test_db(db_engine):
+    """Test database instance with initialized schema, emptied for each test"""
+    with db_engine._connection() as conn:
+        conn.execute("DELETE FROM incidents")
+    return db_engine
+
+
+@pytest.fixture(scope="session")
+def mock_pagerduty_config(request):
+    """Mock PagerDuty configuration data parsed from SAMPLE_CONFIG_YAML (shared, do not mutate)"""
+    # Key on the YAML content so an edited sample never returns a stale cached parse
+    key = f"pagerduty/config/{hashlib.sha1(SAMPLE_CONFIG_YAML.encode()).hexdigest()}"
+    cache = getattr(request.config, 'cache', None)  # None when the cacheprovider plugin is disabled
     
-    # Cleanup
-    try:
-        os.unlink(db_path)
-    except FileNotFoundError:
-        pass
+    cached = cache.get(key, None) if cache is not None else None
+    if cached is None:
+        import yaml
+        cached = yaml.safe_load(SAMPLE_CONFIG_YAML)
+        if cache is not None:
+            cache.set(key, cached)
+    return cached
+
+
+@pytest.fixture(scope="session")
+def api_client():
+    """PagerDutyAPIClient built once per session (tests only patch its methods, never its state)"""
+    from pagerduty_client_v2 import PagerDutyAPIClient
+    return PagerDutyAPIClient("test_token")
 
 
 @pytest.fixture
-def test_db(temp_db):
-    """Test database instance with initialized schema"""
-    db = IncidentDatabase(temp_db)
-    return db
+def stub_load_services(monkeypatch, api_client):
+    """api_client whose service config resolves to a single canned service without reading YAML"""
+    monkeypatch.setattr(api_client, 'load_services_from_config',
+                        lambda *args, **kwargs: (['PHMCGNE'], {'PHMCGNE': 'Test Service'}))
+    return api_client
+
+
+@pytest.fixture(scope="module")
+def batch_incidents():
+    """100 raw API incidents (BATCH_00..BATCH_99) for batch-processing tests; slice, do not mutate"""
+    return [
+        {
+            "id": f"BATCH_{i:02d}",
+            "title": f"Batch incident {i}",
+            "status": "resolved",
+            "service": {"id": "SERVICE1", "summary": "Test Service"},
+            "created_at": "2025-08-23T10:00:00-07:00",
+            "updated_at": "2025-08-23T11:00:00-07:00",
+            "escalation_policy": {"id": "POLICY1", "summary": "Policy"},
+            "urgency": "low",
+            "priority": {"summary": "P3"},
+            "description": "Batch test"
+        }
+        for i in range(100)
+    ]
+
+
+@pytest.fixture(scope="session")
+def http_routes():
+    """Route table for the in-process HTTP transport (tests add entries through mock_http)"""
+    return {}
+
+
+@pytest.fixture(scope="session")
+def mock_http_session(http_routes):
+    """requests.Session answered from http_routes, built once per session"""
+    from test.fixtures.http_transport import make_mock_session
+    return make_mock_session(http_routes)
 
 
 @pytest.fixture
-def mock_pagerduty_config():
-    """Mock PagerDuty configuration data"""
-    return {
-        'token': 'test_api_token_12345',
-        'services': [
-            {
-                'name': 'Test Service 1',
-                'url': 'https://company.pagerduty.com/service-directory/PHMCGNE'
-            },
-            {
-                'name': 'Test Service 2', 
-                'url': 'https://company.pagerduty.com/service-directory/PABCDEF'
-            }
-        ]
-    }
+def mock_http(api_client, mock_http_session, http_routes, monkeypatch):
+    """Send api_client's requests through the in-process transport; returns a route registrar"""
+    monkeypatch.setattr(api_client, 'session', mock_http_session)
+    
+    def add_route(method, url, route):
+        # setitem is undone at teardown, so routes never leak into other tests
+        monkeypatch.setitem(http_routes, (method, url), route)
+    
+    return add_route
+
+
+@pytest.fixture(scope="session")
+def sample_config_mock_open():
+    """builtins.open replacement serving SAMPLE_CONFIG_YAML, built once (read data resets on every open)"""
+    return mock_open(read_data=SAMPLE_CONFIG_YAML)
 
 
 @pytest.fixture
@@ -178,12 +343,16 @@ def mock_pagerduty_log_response():
     }
 
 
+@pytest.fixture(scope="session")
+def app_module():
+    """The app_v2 module, imported on first use so collection does not pay for Flask"""
+    import app_v2
+    return app_v2
+
+
 @pytest.fixture
-def mock_flask_app():
+def mock_flask_app(app_module):
     """Mock Flask app for testing"""
-    import sys
-    sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
-    
-    from app_v2 import app
+    app = app_module.app
     app.config['TESTING'] = True
     return app.test_client()
\ No newline at end of file
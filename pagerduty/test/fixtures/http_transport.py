@@ -0,0 +1,46 @@
+"""
+In-process HTTP transport for testing
+Answers requests from a route table instead of the network, so HTTP mocks need no global patching
+"""
+from typing import Dict, Tuple, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+# (method, url without query string) -> (status, body) or an exception to raise
+Route = Union[Tuple[int, bytes], Exception]
+
+
+class RouteTableAdapter(HTTPAdapter):
+    """Transport adapter that builds responses from a shared route table"""
+    
+    def __init__(self, routes: Dict[Tuple[str, str], Route]):
+        super().__init__()
+        self.routes = routes
+    
+    def send(self, request, **kwargs):
+        route = self.routes.get((request.method, request.url.split('?', 1)[0]))
+        if route is None:
+            raise requests.exceptions.ConnectionError(f"No mock route for {request.method} {request.url}")
+        if isinstance(route, Exception):
+            raise route
+        
+        status, body = route
+        response = requests.Response()
+        response.status_code = status
+        response.reason = requests.status_codes._codes.get(status, ('',))[0].upper()
+        response.headers['Content-Type'] = 'application/json'
+        response._content = body
+        response.url = request.url
+        response.request = request
+        return response
+
+
+def make_mock_session(routes: Dict[Tuple[str, str], Route]) -> requests.Session:
+    """requests.Session whose HTTP and HTTPS traffic is answered from the route table"""
+    session = requests.Session()
+    adapter = RouteTableAdapter(routes)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
@@ -1,6 +1,8 @@
 """
 Sample PagerDuty API response data for testing
 """
+import json
+from types import MappingProxyType
 
 SAMPLE_PAGERDUTY_INCIDENTS_RESPONSE = {
     "incidents": [
@@ -75,6 +77,20 @@ SAMPLE_PAGERDUTY_INCIDENTS_RESPONSE = {
     ]
 }
 
+
+def _freeze(value):
+    """Recursively copy a JSON value into read-only form (dicts to MappingProxyType, lists to tuples)"""
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+# Deep-frozen copies of the individual sample incidents (mutation at any level raises TypeError)
+SAMPLE_INCIDENT_0 = _freeze(SAMPLE_PAGERDUTY_INCIDENTS_RESPONSE["incidents"][0])
+SAMPLE_INCIDENT_1 = _freeze(SAMPLE_PAGERDUTY_INCIDENTS_RESPONSE["incidents"][1])
+
 SAMPLE_PAGERDUTY_LOG_ENTRIES_RESPONSE = {
     "log_entries": [
         {
@@ -99,6 +115,36 @@ SAMPLE_PAGERDUTY_LOG_ENTRIES_RESPONSE = {
     ]
 }
 
+LOG_RESPONSE_NO_ESCALATION = {
+    "log_entries": [
+        {
+            "type": "acknowledge_log_entry",
+            "created_at": "2025-08-23T10:15:00-07:00"
+        }
+    ]
+}
+
+INCIDENT_WITH_CUSTOM_FIELDS = {
+    "incident": {
+        "id": "TEST123",
+        "custom_fields": [
+            {
+                "field": {"name": "resolution"},
+                "value": "ccoe"
+            },
+            {
+                "field": {"name": "prelim_root_cause"},
+                "value": "rheos"
+            }
+        ]
+    }
+}
+
+# API error bodies
+NOT_FOUND_ERROR = {"error": "Not found"}
+
+RATE_LIMIT_ERROR = {"error": {"code": 2006, "message": "Rate limited"}}
+
 SAMPLE_PAGERDUTY_SERVICES_RESPONSE = {
     "services": [
         {
@@ -193,4 +239,12 @@ services:
     url: https://company.pagerduty.com/service-directory/PHMCGNE
   - name: Payment Processing Service
     url: https://company.pagerduty.com/service-directory/PABCDEF
-"""
\ No newline at end of file
+"""
+
+# Response bodies serialized once at import, served directly as (status, body) mock routes
+SAMPLE_PAGERDUTY_INCIDENTS_RESPONSE_BYTES = json.dumps(SAMPLE_PAGERDUTY_INCIDENTS_RESPONSE).encode()
+SAMPLE_PAGERDUTY_LOG_ENTRIES_RESPONSE_BYTES = json.dumps(SAMPLE_PAGERDUTY_LOG_ENTRIES_RESPONSE).encode()
+LOG_RESPONSE_NO_ESCALATION_BYTES = json.dumps(LOG_RESPONSE_NO_ESCALATION).encode()
+INCIDENT_WITH_CUSTOM_FIELDS_BYTES = json.dumps(INCIDENT_WITH_CUSTOM_FIELDS).encode()
+NOT_FOUND_ERROR_BYTES = json.dumps(NOT_FOUND_ERROR).encode()
+RATE_LIMIT_ERROR_BYTES = json.dumps(RATE_LIMIT_ERROR).encode()
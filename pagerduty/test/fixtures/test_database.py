@@ -1,97 +1,101 @@
 """
 Test database utilities and sample data for testing
 """
+import functools
+import operator
 import sqlite3
 import tempfile
 import os
+from contextlib import contextmanager
 from datetime import datetime, timezone, timedelta
-from typing import List
+from itertools import accumulate, repeat
+from typing import Dict, Iterable, List, Tuple, Union
 
+from database_v2 import CREATE_INCIDENTS_TABLE_SQL, CREATE_INCIDENT_INDEXES_SQL
 from incident_v2 import Incident
 
 
+# Column order matches the Incident dataclass fields and the incidents INSERT statement
+INCIDENT_COLUMNS = (
+    'id', 'title', 'status', 'service_id', 'service_name',
+    'created_at', 'resolved_at', 'acknowledged_at',
+    'is_escalated', 'escalation_policy_id', 'escalation_policy_name',
+    'urgency', 'priority', 'description', 'resolved_by_ccoe', 'caused_by_infra'
+)
+
+INSERT_INCIDENT_SQL = f"""
+    INSERT OR REPLACE INTO incidents ({', '.join(INCIDENT_COLUMNS)})
+    VALUES ({', '.join('?' * len(INCIDENT_COLUMNS))})
+"""
+
+_incident_values = operator.attrgetter(*INCIDENT_COLUMNS)
+
+
+def _incident_row(incident: Incident) -> tuple:
+    """INSERT parameters for an incident, with timestamps stored as ISO strings like to_dict()"""
+    return tuple(v.isoformat() if isinstance(v, datetime) else v for v in _incident_values(incident))
+
+
 class TestDatabaseHelper:
     """Helper class for creating and managing test databases"""
     
-    def __init__(self, db_path: str = None):
+    def __init__(self, db_path: Union[str, sqlite3.Connection] = None):
+        self.conn = None
         if db_path is None:
             self.temp_file = tempfile.NamedTemporaryFile(suffix='.db', delete=False)
             self.db_path = self.temp_file.name
             self.temp_file.close()
+        elif isinstance(db_path, sqlite3.Connection):
+            # Already-open (e.g. in-memory) database
+            self.db_path = None
+            self.conn = db_path
+            self.temp_file = None
         else:
             self.db_path = db_path
             self.temp_file = None
     
+    @contextmanager
+    def _connect(self):
+        """Yield the provided connection, or open one on the database file"""
+        if self.conn is not None:
+            yield self.conn
+        else:
+            with sqlite3.connect(self.db_path) as conn:
+                # Test databases are throwaway: skip journaling and fsync on commit
+                conn.execute("PRAGMA journal_mode=MEMORY")
+                conn.execute("PRAGMA synchronous=OFF")
+                conn.execute("PRAGMA temp_store=MEMORY")
+                conn.execute("PRAGMA cache_size=-8000")
+                yield conn
+    
     def create_schema(self):
-        """Create the incidents table schema"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS incidents (
-                    id TEXT PRIMARY KEY,
-                    title TEXT NOT NULL,
-                    status TEXT NOT NULL,
-                    service_id TEXT NOT NULL,
-                    service_name TEXT NOT NULL,
-                    created_at TIMESTAMP NOT NULL,
-                    resolved_at TIMESTAMP,
-                    acknowledged_at TIMESTAMP,
-                    is_escalated BOOLEAN NOT NULL DEFAULT 0,
-                    escalation_policy_id TEXT,
-                    escalation_policy_name TEXT,
-                    urgency TEXT DEFAULT 'low',
-                    priority TEXT,
-                    description TEXT,
-                    resolved_by_ccoe BOOLEAN NOT NULL DEFAULT 0,
-                    caused_by_infra TEXT,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-            
-            # Create indexes
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_service_created ON incidents (service_id, created_at)")
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_status ON incidents (status)")
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_escalated ON incidents (is_escalated)")
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_created_date ON incidents (DATE(created_at))")
-            
+        """Create the incidents table and indexes exactly as IncidentDatabase does"""
+        with self._connect() as conn:
+            conn.execute(CREATE_INCIDENTS_TABLE_SQL)
+            for index_sql in CREATE_INCIDENT_INDEXES_SQL:
+                conn.execute(index_sql)
             conn.commit()
     
-    def insert_sample_incidents(self, incidents: List[Incident]):
-        """Insert sample incidents into the test database"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            
-            for incident in incidents:
-                incident_dict = incident.to_dict()
-                
-                cursor.execute("""
-                    INSERT OR REPLACE INTO incidents (
-                        id, title, status, service_id, service_name,
-                        created_at, resolved_at, acknowledged_at,
-                        is_escalated, escalation_policy_id, escalation_policy_name,
-                        urgency, priority, description, resolved_by_ccoe, caused_by_infra
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    incident_dict['id'],
-                    incident_dict['title'], 
-                    incident_dict['status'],
-                    incident_dict['service_id'],
-                    incident_dict['service_name'],
-                    incident_dict['created_at'],
-                    incident_dict['resolved_at'],
-                    incident_dict['acknowledged_at'],
-                    incident_dict['is_escalated'],
-                    incident_dict['escalation_policy_id'],
-                    incident_dict['escalation_policy_name'],
-                    incident_dict['urgency'],
-                    incident_dict['priority'],
-                    incident_dict['description'],
-                    incident_dict['resolved_by_ccoe'],
-                    incident_dict['caused_by_infra']
-                ))
-            
+    def insert_sample_incidents(self, incidents: Iterable[Incident]):
+        """Insert sample incidents into the test database in a single batch"""
+        rows = [_incident_row(incident) for incident in incidents]
+        with self._connect() as conn:
+            conn.executemany(INSERT_INCIDENT_SQL, rows)
             conn.commit()
     
+    def _insert_raw(self, rows: Iterable[tuple], columns: Tuple[str, ...] = INCIDENT_COLUMNS):
+        """Insert pre-built row tuples (values in `columns` order, timestamps as ISO strings)"""
+        sql = (f"INSERT OR REPLACE INTO incidents ({', '.join(columns)}) "
+               f"VALUES ({', '.join('?' * len(columns))})")
+        with self._connect() as conn:
+            conn.executemany(sql, rows)
+            conn.commit()
+    
+    def explain_query_plan(self, sql: str, params: tuple = ()) -> List[str]:
+        """Return the EXPLAIN QUERY PLAN detail lines for a query (debug helper for index usage)"""
+        with self._connect() as conn:
+            return [row[-1] for row in conn.execute("EXPLAIN QUERY PLAN " + sql, params)]
+    
     def cleanup(self):
         """Clean up temporary database file"""
         if self.temp_file:
@@ -101,61 +105,57 @@ class TestDatabaseHelper:
                 pass
 
 
-def create_sample_test_incidents():
-    """Create a diverse set of test incidents for analytics testing"""
+def _columns() -> Dict[str, list]:
+    """Build the sample incident data as one list per column (recent + older incidents)"""
     utc_minus_7 = timezone(timedelta(hours=-7))
     base_time = datetime(2025, 8, 20, 10, 0, 0, tzinfo=utc_minus_7)
+    old_base_time = base_time - timedelta(days=35)
     
-    incidents = []
+    recent = range(10)  # Recent incidents (last 7 days)
+    old = range(5)      # Older incidents (30+ days ago)
     
-    # Recent incidents (last 7 days)
-    for i in range(10):
-        created_time = base_time + timedelta(days=i, hours=i*2)
-        resolved_time = created_time + timedelta(hours=1) if i % 3 != 0 else None
-        acknowledged_time = created_time + timedelta(minutes=15)
-        
-        incidents.append(Incident(
-            id=f'RECENT{i:02d}ABC',
-            title=f'Recent incident {i}',
-            status='resolved' if resolved_time else 'triggered',
-            service_id='PHMCGNE' if i % 2 == 0 else 'PABCDEF',
-            service_name='Test Service A' if i % 2 == 0 else 'Test Service B',
-            created_at=created_time,
-            resolved_at=resolved_time,
-            acknowledged_at=acknowledged_time,
-            is_escalated=i % 4 == 0,  # 25% escalation rate
-            escalation_policy_id=f'POLICY{i%3}',
-            escalation_policy_name=f'Escalation Policy {i%3}',
-            urgency='high' if i % 3 == 0 else 'low',
-            priority=f'P{(i%4)+1}',
-            description=f'Test incident {i} description',
-            resolved_by_ccoe=i % 5 == 0,  # 20% CCOE resolution rate
-            caused_by_infra='rheos' if i % 6 == 0 else None
-        ))
+    # Evenly spaced timestamps are accumulated in C rather than recomputed per row
+    recent_created = list(accumulate(repeat(timedelta(days=1, hours=2), len(recent) - 1), initial=base_time))
+    old_created = list(accumulate(repeat(timedelta(days=1), len(old) - 1), initial=old_base_time))
     
-    # Older incidents (30+ days ago)
-    old_base_time = base_time - timedelta(days=35)
-    for i in range(5):
-        created_time = old_base_time + timedelta(days=i)
-        resolved_time = created_time + timedelta(hours=2)
-        
-        incidents.append(Incident(
-            id=f'OLD{i:02d}XYZ',
-            title=f'Old incident {i}',
-            status='resolved',
-            service_id='PHMCGNE',
-            service_name='Test Service A',
-            created_at=created_time,
-            resolved_at=resolved_time,
-            acknowledged_at=created_time + timedelta(minutes=30),
-            is_escalated=i % 2 == 0,
-            escalation_policy_id='POLICY0',
-            escalation_policy_name='Default Policy',
-            urgency='low',
-            priority='P3',
-            description=f'Old test incident {i}',
-            resolved_by_ccoe=False,
-            caused_by_infra=None
-        ))
+    # Shared per-row patterns, computed once and reused across columns
+    even_pat = tuple(i % 2 == 0 for i in recent)
+    third_pat = tuple(i % 3 == 0 for i in recent)
+    
+    recent_resolved = [None if third else created + timedelta(hours=1)
+                       for third, created in zip(third_pat, recent_created)]
+    
+    return {
+        'id': [f'RECENT{i:02d}ABC' for i in recent] + [f'OLD{i:02d}XYZ' for i in old],
+        'title': [f'Recent incident {i}' for i in recent] + [f'Old incident {i}' for i in old],
+        'status': ['resolved' if resolved else 'triggered' for resolved in recent_resolved] + ['resolved'] * len(old),
+        'service_id': ['PHMCGNE' if even else 'PABCDEF' for even in even_pat] + ['PHMCGNE'] * len(old),
+        'service_name': ['Test Service A' if even else 'Test Service B' for even in even_pat] + ['Test Service A'] * len(old),
+        'created_at': recent_created + old_created,
+        'resolved_at': recent_resolved + [created + timedelta(hours=2) for created in old_created],
+        'acknowledged_at': ([created + timedelta(minutes=15) for created in recent_created] +
+                            [created + timedelta(minutes=30) for created in old_created]),
+        'is_escalated': [i % 4 == 0 for i in recent] + [i % 2 == 0 for i in old],  # 25% escalation rate for recent
+        'escalation_policy_id': [f'POLICY{i%3}' for i in recent] + ['POLICY0'] * len(old),
+        'escalation_policy_name': [f'Escalation Policy {i%3}' for i in recent] + ['Default Policy'] * len(old),
+        'urgency': ['high' if third else 'low' for third in third_pat] + ['low'] * len(old),
+        'priority': [f'P{(i%4)+1}' for i in recent] + ['P3'] * len(old),
+        'description': [f'Test incident {i} description' for i in recent] + [f'Old test incident {i}' for i in old],
+        'resolved_by_ccoe': [i % 5 == 0 for i in recent] + [False] * len(old),  # 20% CCOE resolution rate for recent
+        'caused_by_infra': ['rheos' if i % 6 == 0 else None for i in recent] + [None] * len(old),
+    }
+
+
+def to_incidents(cols: Dict[str, list]) -> List[Incident]:
+    """Materialize Incident objects from column data (only when a test needs objects)"""
+    _Incident = Incident
+    return [_Incident(*row) for row in zip(*(cols[name] for name in INCIDENT_COLUMNS))]
+
+
+@functools.lru_cache(maxsize=1)
+def create_sample_test_incidents() -> Tuple[Incident, ...]:
+    """Create a diverse set of test incidents for analytics testing
     
-    return incidents
\ No newline at end of file
+    Built once and cached; the returned tuple is shared, so callers must not mutate the incidents.
+    """
+    return tuple(to_incidents(_columns()))
@@ -2,14 +2,45 @@
 Tests for Analytics layer (analytics_v2.py)
 Tests SQL-based metrics calculation with controlled test data
 """
+import dataclasses
 import pytest
+import sqlite3
 from datetime import datetime, timezone, timedelta
-from freezegun import freeze_time
+from unittest.mock import patch
 
 from analytics_v2 import IncidentAnalytics, MetricResult, ServiceMetrics
+from database_v2 import IncidentDatabase
+from incident_v2 import Incident
 from test.fixtures.test_database import TestDatabaseHelper, create_sample_test_incidents
 
 
+UTC_MINUS_7 = timezone(timedelta(hours=-7))
+BASE_TS = datetime(2025, 8, 23, 10, 0, 0, tzinfo=UTC_MINUS_7)
+
+# Leading columns shared by the raw rows the edge-case tests insert
+RAW_COLUMNS = ('id', 'title', 'status', 'service_id', 'service_name', 'created_at')
+
+
+@pytest.fixture(scope="module")
+def populated_ro_analytics(_template_conn):
+    """Read-only analytics over one copy of the sample incidents, shared by the whole module"""
+    conn = sqlite3.connect(":memory:")
+    _template_conn.backup(conn)
+    conn.execute("PRAGMA query_only = ON")  # Guard against a test writing to shared state
+    yield IncidentAnalytics(conn)
+    conn.close()
+
+
+@pytest.fixture(scope="module")
+def empty_analytics():
+    """Read-only analytics over an empty schema, shared by the tests that expect no incidents"""
+    conn = sqlite3.connect(":memory:")
+    TestDatabaseHelper(conn).create_schema()
+    conn.execute("PRAGMA query_only = ON")
+    yield IncidentAnalytics(conn)
+    conn.close()
+
+
 class TestIncidentAnalytics:
     """Test suite for IncidentAnalytics class"""
     
@@ -20,131 +51,59 @@ class TestIncidentAnalytics:
         assert analytics.db_path == temp_db
         assert analytics.utc_minus_7.utcoffset(None) == timedelta(hours=-7)
     
-    def test_get_total_incidents_last_x_days_with_data(self, temp_db):
-        """Test total incidents calculation with sample data"""
-        # Set up test database with incidents
-        db_helper = TestDatabaseHelper(temp_db)
-        db_helper.create_schema()
-        
-        sample_incidents = create_sample_test_incidents()
-        db_helper.insert_sample_incidents(sample_incidents)
-        
-        analytics = IncidentAnalytics(temp_db)
-        
-        # Test with current date being in the range of our test incidents
-        with freeze_time("2025-08-23 15:00:00"):  # UTC time
-            result = analytics.get_total_incidents_last_x_days(7)
-        
-        assert isinstance(result, MetricResult)
-        assert result.metric_name == "total_incidents"
-        assert result.period_days == 7
-        assert result.value >= 0  # Should have some incidents in range
+    def test_analytics_shared_connection(self, analytics_factory):
+        """Test analytics instances built on one connection reuse it for every query"""
+        first, second = analytics_factory(), analytics_factory()
+        
+        assert first.db_path is None
+        assert first._conn is second._conn
+        assert first.get_total_incidents_last_x_days(7).value == 0
+        assert second.get_escalation_rate_last_x_days(7) == 0.0
     
-    def test_get_total_incidents_last_x_days_empty_database(self, temp_db):
-        """Test total incidents calculation with empty database"""
-        db_helper = TestDatabaseHelper(temp_db)
-        db_helper.create_schema()
-        
-        analytics = IncidentAnalytics(temp_db)
-        
-        result = analytics.get_total_incidents_last_x_days(7)
-        
-        assert result.metric_name == "total_incidents"
-        assert result.value == 0
-        assert result.period_days == 7
+    @pytest.fixture
+    def populated_analytics(self, populated_ro_analytics, frozen_now):
+        """Shared sample-data analytics, with the clock pinned inside the sample window"""
+        return populated_ro_analytics
     
-    def test_get_triggered_incidents_last_x_days(self, temp_db):
-        """Test triggered incidents calculation"""
-        db_helper = TestDatabaseHelper(temp_db)
-        db_helper.create_schema()
-        
-        sample_incidents = create_sample_test_incidents()
-        db_helper.insert_sample_incidents(sample_incidents)
-        
-        analytics = IncidentAnalytics(temp_db)
-        
-        with freeze_time("2025-08-23 15:00:00"):
-            result = analytics.get_triggered_incidents_last_x_days(7)
-        
-        assert result.metric_name == "triggered_incidents"
-        assert result.value >= 0
+    @pytest.mark.parametrize("method, metric_name", [
+        ('get_total_incidents_last_x_days', 'total_incidents'),
+        ('get_triggered_incidents_last_x_days', 'triggered_incidents'),
+        ('get_resolved_incidents_last_x_days', 'resolved_incidents'),
+        ('get_escalated_incidents_last_x_days', 'escalated_incidents'),
+    ])
+    def test_last_x_days_metric(self, populated_analytics, method, metric_name):
+        """Test each last-X-days count metric with sample data"""
+        result = getattr(populated_analytics, method)(7)
+        
+        assert result.metric_name == metric_name
         assert result.period_days == 7
-    
-    def test_get_resolved_incidents_last_x_days(self, temp_db):
-        """Test resolved incidents calculation"""
-        db_helper = TestDatabaseHelper(temp_db)
-        db_helper.create_schema()
-        
-        sample_incidents = create_sample_test_incidents()
-        db_helper.insert_sample_incidents(sample_incidents)
-        
-        analytics = IncidentAnalytics(temp_db)
-        
-        with freeze_time("2025-08-23 15:00:00"):
-            result = analytics.get_resolved_incidents_last_x_days(7)
-        
-        assert result.metric_name == "resolved_incidents"
         assert result.value >= 0
-        assert result.period_days == 7
     
-    def test_get_escalated_incidents_last_x_days(self, temp_db):
-        """Test escalated incidents calculation"""
-        db_helper = TestDatabaseHelper(temp_db)
-        db_helper.create_schema()
-        
-        sample_incidents = create_sample_test_incidents()
-        db_helper.insert_sample_incidents(sample_incidents)
-        
-        analytics = IncidentAnalytics(temp_db)
-        
-        with freeze_time("2025-08-23 15:00:00"):
-            result = analytics.get_escalated_incidents_last_x_days(7)
+    def test_get_total_incidents_last_x_days_empty_database(self, empty_analytics):
+        """Test total incidents calculation with empty database"""
+        result = empty_analytics.get_total_incidents_last_x_days(7)
         
-        assert result.metric_name == "escalated_incidents"
-        assert result.value >= 0  # Should have some escalated incidents
+        assert result.metric_name == "total_incidents"
+        assert result.value == 0
         assert result.period_days == 7
     
-    def test_get_escalation_rate_last_x_days_with_incidents(self, temp_db):
+    def test_get_escalation_rate_last_x_days_with_incidents(self, populated_analytics):
         """Test escalation rate calculation with incidents"""
-        db_helper = TestDatabaseHelper(temp_db)
-        db_helper.create_schema()
-        
-        sample_incidents = create_sample_test_incidents()
-        db_helper.insert_sample_incidents(sample_incidents)
-        
-        analytics = IncidentAnalytics(temp_db)
-        
-        with freeze_time("2025-08-23 15:00:00"):
-            rate = analytics.get_escalation_rate_last_x_days(7)
+        rate = populated_analytics.get_escalation_rate_last_x_days(7)
         
         assert isinstance(rate, float)
         assert 0.0 <= rate <= 100.0  # Should be a valid percentage
     
-    def test_get_escalation_rate_last_x_days_no_incidents(self, temp_db):
+    def test_get_escalation_rate_last_x_days_no_incidents(self, empty_analytics):
         """Test escalation rate calculation with no incidents"""
-        db_helper = TestDatabaseHelper(temp_db)
-        db_helper.create_schema()
-        
-        analytics = IncidentAnalytics(temp_db)
-        
-        rate = analytics.get_escalation_rate_last_x_days(7)
+        rate = empty_analytics.get_escalation_rate_last_x_days(7)
         
         assert rate == 0.0
     
-    def test_get_service_metrics_specific_service(self, temp_db):
+    def test_get_service_metrics_specific_service(self, populated_analytics):
         """Test service-specific metrics calculation"""
-        db_helper = TestDatabaseHelper(temp_db)
-        db_helper.create_schema()
-        
-        sample_incidents = create_sample_test_incidents()
-        db_helper.insert_sample_incidents(sample_incidents)
-        
-        analytics = IncidentAnalytics(temp_db)
+        metrics = populated_analytics.get_service_metrics('PHMCGNE', 7)
         
-        with freeze_time("2025-08-23 15:00:00"):
-            metrics = analytics.get_service_metrics('PHMCGNE', 7)
-        
-        assert isinstance(metrics, ServiceMetrics)
         assert metrics.service_id == 'PHMCGNE'
         assert metrics.total_incidents >= 0
         assert metrics.triggered_incidents >= 0
@@ -152,14 +111,21 @@ class TestIncidentAnalytics:
         assert metrics.escalated_incidents >= 0
         assert 0.0 <= metrics.escalation_rate <= 100.0
     
-    def test_get_service_metrics_nonexistent_service(self, temp_db):
+    def test_get_service_metrics_single_query(self, populated_ro_analytics):
+        """Test service metrics and the all-services summary each cost exactly one SQL statement"""
+        statements = []
+        populated_ro_analytics._conn.set_trace_callback(statements.append)
+        try:
+            populated_ro_analytics.get_service_metrics('PHMCGNE', 7)
+            populated_ro_analytics.get_all_services_summary(7)
+        finally:
+            populated_ro_analytics._conn.set_trace_callback(None)
+        
+        assert [sql.lstrip().split()[0] for sql in statements] == ['SELECT', 'SELECT']
+    
+    def test_get_service_metrics_nonexistent_service(self, populated_ro_analytics):
         """Test service metrics for non-existent service"""
-        db_helper = TestDatabaseHelper(temp_db)
-        db_helper.create_schema()
-        
-        analytics = IncidentAnalytics(temp_db)
-        
-        metrics = analytics.get_service_metrics('NONEXISTENT', 7)
+        metrics = populated_ro_analytics.get_service_metrics('NONEXISTENT', 7)
         
         assert metrics.service_id == 'NONEXISTENT'
         assert metrics.total_incidents == 0
@@ -168,84 +134,94 @@ class TestIncidentAnalytics:
         assert metrics.escalated_incidents == 0
         assert metrics.escalation_rate == 0.0
     
-    def test_get_all_services_summary(self, temp_db):
+    def test_get_all_services_summary(self, populated_analytics):
         """Test getting summary for all services"""
-        db_helper = TestDatabaseHelper(temp_db)
-        db_helper.create_schema()
-        
-        sample_incidents = create_sample_test_incidents()
-        db_helper.insert_sample_incidents(sample_incidents)
-        
-        analytics = IncidentAnalytics(temp_db)
-        
-        with freeze_time("2025-08-23 15:00:00"):
-            summary = analytics.get_all_services_summary(7)
+        summary = populated_analytics.get_all_services_summary(7)
         
         assert isinstance(summary, list)
-        assert len(summary) >= 0  # Should have at least some services
-        
-        if summary:
-            for service_metrics in summary:
-                assert isinstance(service_metrics, ServiceMetrics)
-                assert service_metrics.service_id is not None
+        assert all(sm.service_id for sm in summary)
     
-    def test_get_daily_incident_counts(self, temp_db):
+    def test_get_daily_incident_counts(self, populated_analytics):
         """Test daily incident count aggregation"""
-        db_helper = TestDatabaseHelper(temp_db)
-        db_helper.create_schema()
-        
-        sample_incidents = create_sample_test_incidents()
-        db_helper.insert_sample_incidents(sample_incidents)
-        
-        analytics = IncidentAnalytics(temp_db)
-        
-        with freeze_time("2025-08-23 15:00:00"):
-            daily_counts = analytics.get_daily_incident_counts(7)
-        
-        assert isinstance(daily_counts, list)
-        assert len(daily_counts) <= 7  # Should not exceed requested days
-        
-        for day_data in daily_counts:
-            assert 'date' in day_data
-            assert 'total' in day_data
-            assert 'escalated' in day_data
-            assert isinstance(day_data['total'], int)
-            assert isinstance(day_data['escalated'], int)
-            assert day_data['escalated'] <= day_data['total']
+        daily_counts = populated_analytics.get_daily_incident_counts(7)
+        
+        # One row per UTC-7 day with a recent incident, oldest first
+        assert daily_counts == [
+            {'date': '2025-08-20', 'total': 1, 'escalated': 1},
+            {'date': '2025-08-21', 'total': 1, 'escalated': 0},
+            {'date': '2025-08-22', 'total': 1, 'escalated': 0},
+            {'date': '2025-08-23', 'total': 1, 'escalated': 0},
+        ]
     
-    def test_get_incidents_by_service_for_calendar(self, temp_db):
+    def test_get_incidents_by_service_for_calendar(self, populated_ro_analytics):
         """Test calendar data generation for specific service"""
-        db_helper = TestDatabaseHelper(temp_db)
-        db_helper.create_schema()
-        
-        sample_incidents = create_sample_test_incidents()
-        db_helper.insert_sample_incidents(sample_incidents)
-        
-        analytics = IncidentAnalytics(temp_db)
+        calendar_data = populated_ro_analytics.get_incidents_by_service_for_calendar('PHMCGNE', 2025, 8)
         
+        # Only this service's August incidents; July sample incidents are excluded
+        assert list(calendar_data) == ['2025-08-20', '2025-08-22', '2025-08-24', '2025-08-26', '2025-08-29']
+        assert calendar_data['2025-08-20'] == [
+            {'id': 'RECENT00ABC', 'title': 'Recent incident 0', 'status': 'triggered', 'is_escalated': True}
+        ]
+    
+    def test_daily_and_calendar_buckets_match_their_window(self, empty_db, frozen_now):
+        """Test rows with a non-UTC-7 offset are filtered and grouped by the same UTC-7 date"""
+        rows = [(incident_id, 'Offset edge case', 'resolved', 'PHMCGNE', 'Test Service A', created_at)
+                for incident_id, created_at in [
+                    ('EDGE_EARLY', '2025-08-16T23:30:00-10:00'),  # 2025-08-17 02:30 UTC-7
+                    ('EDGE_LATE', '2025-08-24T03:00:00+00:00'),   # 2025-08-23 20:00 UTC-7
+                    ('BEFORE', '2025-08-17T05:00:00+00:00'),      # 2025-08-16 22:00 UTC-7
+                    ('AUG_31', '2025-09-01T03:00:00+00:00'),      # 2025-08-31 20:00 UTC-7
+                    ('JUL_31', '2025-08-01T05:00:00+00:00'),      # 2025-07-31 22:00 UTC-7
+                ]]
+        TestDatabaseHelper(empty_db)._insert_raw(rows, RAW_COLUMNS)
+        
+        analytics = IncidentAnalytics(empty_db)
+        
+        # Window is 2025-08-16..2025-08-23 UTC-7
+        assert analytics.get_daily_incident_counts(7) == [
+            {'date': '2025-08-16', 'total': 1, 'escalated': 0},
+            {'date': '2025-08-17', 'total': 1, 'escalated': 0},
+            {'date': '2025-08-23', 'total': 1, 'escalated': 0},
+        ]
         calendar_data = analytics.get_incidents_by_service_for_calendar('PHMCGNE', 2025, 8)
+        assert list(calendar_data) == ['2025-08-16', '2025-08-17', '2025-08-23', '2025-08-31']
+    
+    def test_daily_trend_buckets_by_utc_minus_7_date(self, empty_db, frozen_now):
+        """Test the daily trend groups on the UTC-7 date it filters on, not the UTC date"""
+        # 20:00 UTC-7 on 8/23 is already 8/24 in UTC
+        TestDatabaseHelper(empty_db)._insert_raw(
+            [('EVENING', 'Evening incident', 'triggered', 'PHMCGNE', 'Test Service A', '2025-08-23T20:00:00-07:00')],
+            RAW_COLUMNS
+        )
+        
+        trend = IncidentAnalytics(empty_db).get_daily_incident_trend_last_x_days(7)
         
-        assert isinstance(calendar_data, dict)
-        
-        # Check that dates are in expected format
-        for date_str, incidents in calendar_data.items():
-            assert len(date_str) == 10  # YYYY-MM-DD format
-            assert isinstance(incidents, list)
-            
-            for incident in incidents:
-                assert 'id' in incident
-                assert 'title' in incident
-                assert 'status' in incident
-                assert 'is_escalated' in incident
+        assert [(day['date'], day['total_incidents']) for day in trend] == [('2025-08-23', 1)]
     
-    def test_date_range_filtering_accuracy(self, temp_db, utc_minus_7):
+    def test_last_x_days_window_is_shared_by_every_method(self, empty_db, frozen_now):
+        """Test every last-X-days method counts the same rows: today plus the X days before it"""
+        rows = [(incident_id, 'Window edge case', 'resolved', 'PHMCGNE', 'Test Service A', created_at)
+                for incident_id, created_at in [
+                    ('FIRST_DAY', '2025-08-16T00:30:00-07:00'),    # today - 7: inside
+                    ('DAY_BEFORE', '2025-08-15T23:30:00-07:00'),   # today - 8: outside
+                    ('OFFSET_BEFORE', '2025-08-16T06:30:00+00:00'),  # 2025-08-15 23:30 UTC-7: outside
+                    ('TODAY', '2025-08-23T23:00:00-07:00'),        # today: inside
+                    ('TOMORROW', '2025-08-24T00:30:00-07:00'),     # outside
+                ]]
+        TestDatabaseHelper(empty_db)._insert_raw(rows, RAW_COLUMNS)
+        
+        analytics = IncidentAnalytics(empty_db)
+        
+        assert analytics.get_total_incidents_last_x_days(7).value == 2
+        assert [day['date'] for day in analytics.get_daily_incident_counts(7)] == ['2025-08-16', '2025-08-23']
+        assert [day['date'] for day in analytics.get_daily_incident_trend_last_x_days(7)] == ['2025-08-23', '2025-08-16']
+        assert [m.total_incidents for m in analytics.get_service_metrics_last_x_days(7)] == [2]
+    
+    def test_date_range_filtering_accuracy(self, empty_db, frozen_now):
         """Test that date range filtering works accurately"""
-        db_helper = TestDatabaseHelper(temp_db)
-        db_helper.create_schema()
+        db_helper = TestDatabaseHelper(empty_db)
         
         # Create incidents on specific dates
-        from incident_v2 import Incident
-        
         # Incident within range
         incident_in_range = Incident(
             id='IN_RANGE',
@@ -253,7 +229,7 @@ class TestIncidentAnalytics:
             status='resolved',
             service_id='TEST_SERVICE',
             service_name='Test Service',
-            created_at=datetime(2025, 8, 23, 10, 0, 0, tzinfo=utc_minus_7)
+            created_at=BASE_TS
         )
         
         # Incident outside range (older)
@@ -263,146 +239,154 @@ class TestIncidentAnalytics:
             status='resolved',
             service_id='TEST_SERVICE',
             service_name='Test Service',
-            created_at=datetime(2025, 8, 10, 10, 0, 0, tzinfo=utc_minus_7)  # Too old
+            created_at=datetime(2025, 8, 10, 10, 0, 0, tzinfo=UTC_MINUS_7)  # Too old
         )
         
         db_helper.insert_sample_incidents([incident_in_range, incident_out_range])
         
-        analytics = IncidentAnalytics(temp_db)
+        analytics = IncidentAnalytics(empty_db)
         
         # Test with specific date that should only include the in-range incident
-        with freeze_time("2025-08-23 15:00:00"):
-            result = analytics.get_total_incidents_last_x_days(1)  # Last 1 day
+        result = analytics.get_total_incidents_last_x_days(1)  # Last 1 day
         
         assert result.value == 1  # Should only count the in-range incident
     
-    def test_escalation_rate_calculation_edge_cases(self, temp_db, utc_minus_7):
+    def test_service_time_filter_uses_index(self, empty_db):
+        """Test service and time-range filters are served by an index rather than a table scan"""
+        plan = TestDatabaseHelper(empty_db).explain_query_plan(
+            "SELECT COUNT(*) FROM incidents WHERE service_id = ? AND created_at >= ?",
+            ('TEST_SERVICE', BASE_TS.isoformat())
+        )
+        
+        assert any('idx_incidents_service_created' in detail for detail in plan)
+    
+    def test_range_filters_use_index(self, temp_db, frozen_now):
+        """Test every last-X-days query filters on the UTC-7 date column through an index"""
+        # Schema and indexes come from IncidentDatabase itself, as in production
+        with patch('builtins.print'):
+            db = IncidentDatabase(temp_db)
+            db.store_incidents_batch(list(create_sample_test_incidents()))
+        db.close()
+        
+        # Capture the SQL the public methods actually run (bound values are inlined by the trace)
+        traced = []
+        conn = sqlite3.connect(temp_db, uri=True)
+        conn.set_trace_callback(traced.append)
+        analytics = IncidentAnalytics(conn)
+        analytics.get_summary_metrics(7)
+        analytics.get_ccoe_resolved_incidents_last_x_days(7)
+        analytics.get_infrastructure_caused_incidents_last_x_days(7)
+        analytics.get_service_metrics('PHMCGNE', 7)
+        conn.set_trace_callback(None)
+        
+        statements = set(traced)  # The escalation rate re-runs the total and escalated counts
+        assert len(statements) == 9
+        for sql in statements:
+            where = sql.lower().split('where', 1)[1].split('group by', 1)[0]
+            assert 'created_date_utc_m7 >=' in where and 'date(created_at' not in where, sql
+            plan = [row[-1] for row in conn.execute("EXPLAIN QUERY PLAN " + sql)]
+            assert any(detail.startswith('SEARCH') and 'INDEX' in detail for detail in plan), (sql, plan)
+        conn.close()
+    
+    def test_escalation_ccoe_infra_metrics_combined(self, empty_db, frozen_now):
+        """Test escalation rate, CCOE resolution and infrastructure cause counts in one query"""
+        db_helper = TestDatabaseHelper(empty_db)
+        
+        # Each row encodes the three attributes independently (full cross product)
+        rows = [(f'COMBO_{i}', f'Combined metrics test {i}', 'resolved', 'TEST_SERVICE', 'Test Service',
+                 (BASE_TS + timedelta(minutes=i)).isoformat(),
+                 bool(i & 1), bool(i & 2), ('rheos', 'hadoop')[i & 1] if i & 4 else None)
+                for i in range(8)]
+        
+        db_helper._insert_raw(rows, RAW_COLUMNS + ('is_escalated', 'resolved_by_ccoe', 'caused_by_infra'))
+        
+        analytics = IncidentAnalytics(empty_db)
+        
+        [metrics] = analytics.get_service_metrics_last_x_days(1)
+        
+        assert metrics.service_id == 'TEST_SERVICE'
+        assert metrics.total_incidents == 8
+        assert metrics.escalation_rate == 50.0  # 4 out of 8 escalated
+        assert metrics.ccoe_resolved_incidents == 4
+        assert metrics.infrastructure_caused_incidents == 4
+    
+    @pytest.mark.slow
+    def test_escalation_rate_calculation_edge_cases(self, empty_db, frozen_now):
         """Test escalation rate calculation edge cases"""
-        db_helper = TestDatabaseHelper(temp_db)
-        db_helper.create_schema()
-        
-        from incident_v2 import Incident
-        
-        # Create incidents with known escalation pattern
-        incidents = []
-        for i in range(4):
-            incidents.append(Incident(
-                id=f'ESCAL_{i}',
-                title=f'Escalation test {i}',
-                status='resolved',
-                service_id='TEST_SERVICE',
-                service_name='Test Service',
-                created_at=datetime(2025, 8, 23, 10, i, 0, tzinfo=utc_minus_7),
-                is_escalated=(i % 2 == 0)  # 50% escalation rate
-            ))
-        
-        db_helper.insert_sample_incidents(incidents)
+        db_helper = TestDatabaseHelper(empty_db)
         
-        analytics = IncidentAnalytics(temp_db)
+        # Create incidents with known escalation pattern (50% escalation rate)
+        rows = [(f'ESCAL_{i}', f'Escalation test {i}', 'resolved', 'TEST_SERVICE', 'Test Service',
+                 (BASE_TS + timedelta(minutes=i)).isoformat(), i % 2 == 0)
+                for i in range(4)]
+        
+        db_helper._insert_raw(rows, RAW_COLUMNS + ('is_escalated',))
+        
+        analytics = IncidentAnalytics(empty_db)
         
-        with freeze_time("2025-08-23 15:00:00"):
-            rate = analytics.get_escalation_rate_last_x_days(1)
+        rate = analytics.get_escalation_rate_last_x_days(1)
         
         assert rate == 50.0  # Should be exactly 50% (2 out of 4 escalated)
     
-    def test_ccoe_resolution_metrics(self, temp_db, utc_minus_7):
+    @pytest.mark.slow
+    def test_ccoe_resolution_metrics(self, empty_db, frozen_now):
         """Test CCOE resolution tracking"""
-        db_helper = TestDatabaseHelper(temp_db)
-        db_helper.create_schema()
-        
-        from incident_v2 import Incident
-        
-        # Create incidents with known CCOE resolution pattern
-        incidents = []
-        for i in range(3):
-            incidents.append(Incident(
-                id=f'CCOE_{i}',
-                title=f'CCOE test {i}',
-                status='resolved',
-                service_id='TEST_SERVICE',
-                service_name='Test Service',
-                created_at=datetime(2025, 8, 23, 10, i, 0, tzinfo=utc_minus_7),
-                resolved_by_ccoe=(i == 0)  # Only first incident resolved by CCOE
-            ))
-        
-        db_helper.insert_sample_incidents(incidents)
+        db_helper = TestDatabaseHelper(empty_db)
         
-        analytics = IncidentAnalytics(temp_db)
+        # Create incidents with known CCOE resolution pattern (only the first resolved by CCOE)
+        rows = [(f'CCOE_{i}', f'CCOE test {i}', 'resolved', 'TEST_SERVICE', 'Test Service',
+                 (BASE_TS + timedelta(minutes=i)).isoformat(), i == 0)
+                for i in range(3)]
+        
+        db_helper._insert_raw(rows, RAW_COLUMNS + ('resolved_by_ccoe',))
+        
+        analytics = IncidentAnalytics(empty_db)
         
-        with freeze_time("2025-08-23 15:00:00"):
-            metrics = analytics.get_service_metrics('TEST_SERVICE', 1)
+        metrics = analytics.get_service_metrics('TEST_SERVICE', 1)
         
         assert metrics.ccoe_resolved_incidents == 1  # Only one resolved by CCOE
         assert metrics.total_incidents == 3
     
-    def test_infrastructure_cause_metrics(self, temp_db, utc_minus_7):
+    @pytest.mark.slow
+    def test_infrastructure_cause_metrics(self, empty_db, frozen_now):
         """Test infrastructure cause tracking"""
-        db_helper = TestDatabaseHelper(temp_db)
-        db_helper.create_schema()
-        
-        from incident_v2 import Incident
+        db_helper = TestDatabaseHelper(empty_db)
         
         # Create incidents with infrastructure causes
-        incidents = []
         infra_causes = [None, 'rheos', 'hadoop', None]
+        rows = [(f'INFRA_{i}', f'Infrastructure test {i}', 'resolved', 'TEST_SERVICE', 'Test Service',
+                 (BASE_TS + timedelta(minutes=i)).isoformat(), cause)
+                for i, cause in enumerate(infra_causes)]
         
-        for i, cause in enumerate(infra_causes):
-            incidents.append(Incident(
-                id=f'INFRA_{i}',
-                title=f'Infrastructure test {i}',
-                status='resolved',
-                service_id='TEST_SERVICE',
-                service_name='Test Service',
-                created_at=datetime(2025, 8, 23, 10, i, 0, tzinfo=utc_minus_7),
-                caused_by_infra=cause
-            ))
-        
-        db_helper.insert_sample_incidents(incidents)
+        db_helper._insert_raw(rows, RAW_COLUMNS + ('caused_by_infra',))
         
-        analytics = IncidentAnalytics(temp_db)
+        analytics = IncidentAnalytics(empty_db)
         
-        with freeze_time("2025-08-23 15:00:00"):
-            metrics = analytics.get_service_metrics('TEST_SERVICE', 1)
+        metrics = analytics.get_service_metrics('TEST_SERVICE', 1)
         
         assert metrics.infrastructure_caused_incidents == 2  # Two with non-None causes
         assert metrics.total_incidents == 4
     
-    def test_metric_result_dataclass(self):
-        """Test MetricResult dataclass functionality"""
-        result = MetricResult(
-            metric_name="test_metric",
-            value=42,
-            period_days=7,
-            service_id="TEST_SERVICE",
-            service_name="Test Service"
-        )
-        
-        assert result.metric_name == "test_metric"
-        assert result.value == 42
-        assert result.period_days == 7
-        assert result.service_id == "TEST_SERVICE"
-        assert result.service_name == "Test Service"
-    
-    def test_service_metrics_dataclass(self):
-        """Test ServiceMetrics dataclass functionality"""
-        metrics = ServiceMetrics(
-            service_id="TEST_SERVICE",
-            service_name="Test Service",
-            total_incidents=100,
-            triggered_incidents=20,
-            resolved_incidents=80,
-            escalated_incidents=15,
-            escalation_rate=15.0,
-            ccoe_resolved_incidents=10,
-            infrastructure_caused_incidents=5
-        )
-        
-        assert metrics.service_id == "TEST_SERVICE"
-        assert metrics.service_name == "Test Service"
-        assert metrics.total_incidents == 100
-        assert metrics.triggered_incidents == 20
-        assert metrics.resolved_incidents == 80
-        assert metrics.escalated_incidents == 15
-        assert metrics.escalation_rate == 15.0
-        assert metrics.ccoe_resolved_incidents == 10
-        assert metrics.infrastructure_caused_incidents == 5
\ No newline at end of file
+    @pytest.mark.parametrize("cls, kwargs", [
+        (MetricResult, {
+            'metric_name': "test_metric",
+            'value': 42,
+            'period_days': 7,
+            'service_id': "TEST_SERVICE",
+            'service_name': "Test Service"
+        }),
+        (ServiceMetrics, {
+            'service_id': "TEST_SERVICE",
+            'service_name': "Test Service",
+            'total_incidents': 100,
+            'triggered_incidents': 20,
+            'resolved_incidents': 80,
+            'escalated_incidents': 15,
+            'escalation_rate': 15.0,
+            'ccoe_resolved_incidents': 10,
+            'infrastructure_caused_incidents': 5
+        }),
+    ])
+    def test_dataclass_roundtrip(self, cls, kwargs):
+        """Test MetricResult and ServiceMetrics keep every field they are given"""
+        assert dataclasses.asdict(cls(**kwargs)) == kwargs
@@ -7,41 +7,127 @@ import json
 import tempfile
 import os
 from datetime import datetime, timezone, timedelta
-from unittest.mock import patch, mock_open, MagicMock
+from types import SimpleNamespace
+from unittest.mock import patch, mock_open, MagicMock, create_autospec
 
-from app_v2 import app, load_service_config, UTC_MINUS_7
-from analytics_v2 import ServiceMetrics
-from test.fixtures.sample_pagerduty_data import SAMPLE_CONFIG_YAML
+from analytics_v2 import IncidentAnalytics, ServiceMetrics
+from database_v2 import IncidentDatabase
+
+
+UTC_MINUS_7 = timezone(timedelta(hours=-7))
+
+# Services parsed from SAMPLE_CONFIG_YAML by load_service_config()
+_EXPECTED_SERVICES = {
+    'PHMCGNE': {
+        'name': 'Production Database Service',
+        'url': 'https://company.pagerduty.com/service-directory/PHMCGNE'
+    },
+    'PABCDEF': {
+        'name': 'Payment Processing Service',
+        'url': 'https://company.pagerduty.com/service-directory/PABCDEF'
+    }
+}
+
+
+# Shared read-only test data, built once at import (do not mutate in tests)
+_SUMMARY_METRICS = ServiceMetrics(
+    service_id='PHMCGNE',
+    service_name='Test Service',
+    total_incidents=100,
+    triggered_incidents=20,
+    resolved_incidents=80,
+    escalated_incidents=15,
+    escalation_rate=15.0,
+    ccoe_resolved_incidents=10,
+    infrastructure_caused_incidents=5
+)
+
+_MOCK_DAILY_COUNTS = [
+    {'date': '2025-08-23', 'total': 5, 'escalated': 1},
+    {'date': '2025-08-22', 'total': 3, 'escalated': 0},
+    {'date': '2025-08-21', 'total': 7, 'escalated': 2}
+]
+
+
+def make_fake_incident(**kw):
+    """Plain-attribute stand-in for an Incident; _triggered/_resolved/_infra set the predicate results"""
+    triggered = kw.pop('_triggered', False)
+    resolved = kw.pop('_resolved', True)
+    infra = kw.pop('_infra', False)
+    incident = SimpleNamespace(**kw)
+    incident.is_triggered_or_acknowledged = lambda: triggered
+    incident.is_resolved = lambda: resolved
+    incident.is_caused_by_infrastructure = lambda: infra
+    return incident
+
+
+@pytest.fixture(scope="module")
+def client(app_module):
+    """Test Flask client shared by the module (no test mutates app config or client state)"""
+    app_module.app.config['TESTING'] = True
+    with app_module.app.test_client() as client:
+        yield client
+
+
+@pytest.fixture(autouse=True)
+def isolated_cwd(tmp_path, monkeypatch):
+    """Run each test in its own directory so unmocked default paths (incidents_v2.db) never collide across xdist workers"""
+    monkeypatch.chdir(tmp_path)
+
+
+@pytest.fixture(scope="module")
+def _db_spec():
+    """Autospecced IncidentDatabase instance, introspected once per module"""
+    return create_autospec(IncidentDatabase, instance=True)
+
+
+@pytest.fixture(scope="module")
+def _analytics_spec():
+    """Autospecced IncidentAnalytics instance, introspected once per module"""
+    return create_autospec(IncidentAnalytics, instance=True)
+
+
+@pytest.fixture
+def mock_incident_db(_db_spec):
+    """IncidentDatabase instance mock returned by app_v2.IncidentDatabase()"""
+    with patch('app_v2.IncidentDatabase', return_value=_db_spec):
+        yield _db_spec
+    _db_spec.reset_mock(return_value=True, side_effect=True)
+
+
+@pytest.fixture
+def mock_analytics(_analytics_spec):
+    """IncidentAnalytics instance mock returned by app_v2.IncidentAnalytics()"""
+    with patch('app_v2.IncidentAnalytics', return_value=_analytics_spec):
+        yield _analytics_spec
+    _analytics_spec.reset_mock(return_value=True, side_effect=True)
 
 
 class TestFlaskWebApplication:
     """Test suite for Flask web application"""
     
-    @pytest.fixture
-    def client(self):
-        """Create test Flask client"""
-        app.config['TESTING'] = True
-        with app.test_client() as client:
-            yield client
-    
     def test_dashboard_route(self, client):
         """Test main dashboard route"""
-        with patch('app_v2.load_service_config') as mock_load:
-            mock_load.return_value = {
-                'PHMCGNE': {'name': 'Test Service', 'url': 'https://test.com/PHMCGNE'}
-            }
-            
+        services = {
+            'PHMCGNE': {'name': 'Test Service', 'url': 'https://test.com/PHMCGNE'}
+        }
+        
+        # Template rendering is stubbed; the view's job is picking the template and passing services
+        with patch('app_v2.load_service_config', return_value=services), \
+             patch('app_v2.render_template', return_value='<html>Test Service</html>') as mock_render:
             response = client.get('/')
             
             assert response.status_code == 200
             assert b'Test Service' in response.data  # Should contain service name
+            mock_render.assert_called_once_with('dashboard_v2.html', services=services)
     
     def test_admin_route(self, client):
         """Test admin page route"""
-        response = client.get('/admin')
-        
-        assert response.status_code == 200
-        # Should render admin template successfully
+        with patch('app_v2.render_template', return_value='<html>Admin</html>') as mock_render:
+            response = client.get('/admin')
+            
+            assert response.status_code == 200
+            mock_render.assert_called_once_with('admin_v2.html')
     
     def test_api_services_route(self, client):
         """Test API endpoint for getting all services"""
@@ -60,10 +146,10 @@ class TestFlaskWebApplication:
             data = response.get_json()
             assert data == mock_services
     
-    def test_api_service_calendar_valid_service(self, client):
+    def test_api_service_calendar_valid_service(self, client, mock_incident_db):
         """Test calendar API with valid service and date parameters"""
         mock_incidents = [
-            MagicMock(
+            make_fake_incident(
                 id='TEST123',
                 title='Test Incident',
                 created_at=datetime(2025, 8, 23, 10, 0, 0, tzinfo=UTC_MINUS_7),
@@ -71,52 +157,46 @@ class TestFlaskWebApplication:
                 urgency='high',
                 status='resolved',
                 resolved_by_ccoe=True,
-                caused_by_infra='rheos'
+                caused_by_infra='rheos',
+                _infra=True
             )
         ]
         
-        # Mock methods on the incident objects
-        mock_incidents[0].is_triggered_or_acknowledged.return_value = False
-        mock_incidents[0].is_resolved.return_value = True
-        mock_incidents[0].is_caused_by_infrastructure.return_value = True
+        mock_incident_db.get_incidents_by_date_range.return_value = mock_incidents
         
-        with patch('app_v2.IncidentDatabase') as mock_db_class:
-            mock_db = MagicMock()
-            mock_db.get_incidents_by_date_range.return_value = mock_incidents
-            mock_db_class.return_value = mock_db
-            
-            response = client.get('/api/service/PHMCGNE/calendar?year=2025&month=8')
-            
-            assert response.status_code == 200
-            assert response.is_json
-            
-            data = response.get_json()
-            assert '2025-08-23' in data
-            
-            day_data = data['2025-08-23']
-            assert day_data['total'] == 1
-            assert day_data['resolved'] == 1
-            assert day_data['escalated'] == 1
-            assert day_data['ccoe_resolved'] == 1
-            assert day_data['infrastructure_caused'] == 1
-            assert len(day_data['escalated_incidents']) == 1
+        response = client.get('/api/service/PHMCGNE/calendar?year=2025&month=8')
+        
+        assert response.status_code == 200
+        assert response.is_json
+        
+        data = response.get_json()
+        assert '2025-08-23' in data
+        
+        day_data = data['2025-08-23']
+        assert day_data['total'] == 1
+        assert day_data['resolved'] == 1
+        assert day_data['escalated'] == 1
+        assert day_data['ccoe_resolved'] == 1
+        assert day_data['infrastructure_caused'] == 1
+        assert len(day_data['escalated_incidents']) == 1
     
-    def test_api_service_calendar_default_parameters(self, client):
+    def test_api_service_calendar_default_parameters(self, client, mock_incident_db):
         """Test calendar API with default year/month parameters"""
-        with patch('app_v2.IncidentDatabase') as mock_db_class:
-            mock_db = MagicMock()
-            mock_db.get_incidents_by_date_range.return_value = []
-            mock_db_class.return_value = mock_db
-            
-            with patch('app_v2.datetime') as mock_datetime:
-                mock_datetime.now.return_value = datetime(2025, 8, 23)
-                
-                response = client.get('/api/service/PHMCGNE/calendar')
-                
-                assert response.status_code == 200
-                
-                # Should call with current year/month
-                mock_db.get_incidents_by_date_range.assert_called_once()
+        mock_incident_db.get_incidents_by_date_range.return_value = []
+        
+        today = datetime.now()
+        response = client.get('/api/service/PHMCGNE/calendar')
+        
+        assert response.status_code == 200
+        
+        # Should query the current month, from the 1st through its last day
+        month_start = today.date().replace(day=1)
+        next_month = (month_start + timedelta(days=32)).replace(day=1)
+        mock_incident_db.get_incidents_by_date_range.assert_called_once_with(
+            month_start.isoformat(),
+            (next_month - timedelta(days=1)).isoformat(),
+            'PHMCGNE'
+        )
     
     def test_api_service_calendar_database_error(self, client):
         """Test calendar API handles database errors"""
@@ -131,114 +211,78 @@ class TestFlaskWebApplication:
             data = response.get_json()
             assert 'error' in data
     
-    def test_api_service_calendar_incident_timezone_handling(self, client):
+    def test_api_service_calendar_incident_timezone_handling(self, client, mock_incident_db):
         """Test calendar API handles different timezone scenarios"""
         # Test with timezone-aware incident
-        utc_incident = MagicMock(
+        utc_incident = make_fake_incident(
             id='UTC123',
             title='UTC Incident',
             created_at=datetime(2025, 8, 24, 1, 0, 0, tzinfo=timezone.utc),  # UTC midnight = UTC-7 18:00 prev day
             is_escalated=False,
-            resolved_by_ccoe=False
+            resolved_by_ccoe=False,
+            _triggered=True,
+            _resolved=False
         )
-        utc_incident.is_triggered_or_acknowledged.return_value = True
-        utc_incident.is_resolved.return_value = False
-        utc_incident.is_caused_by_infrastructure.return_value = False
         
         # Test with naive incident
-        naive_incident = MagicMock(
+        naive_incident = make_fake_incident(
             id='NAIVE123',
             title='Naive Incident',
             created_at=datetime(2025, 8, 23, 10, 0, 0),  # Naive datetime
             is_escalated=False,
-            resolved_by_ccoe=False
+            resolved_by_ccoe=False,
+            _triggered=True,
+            _resolved=False
         )
-        naive_incident.is_triggered_or_acknowledged.return_value = True
-        naive_incident.is_resolved.return_value = False
-        naive_incident.is_caused_by_infrastructure.return_value = False
         
-        with patch('app_v2.IncidentDatabase') as mock_db_class:
-            mock_db = MagicMock()
-            mock_db.get_incidents_by_date_range.return_value = [utc_incident, naive_incident]
-            mock_db_class.return_value = mock_db
-            
-            response = client.get('/api/service/PHMCGNE/calendar?year=2025&month=8')
-            
-            assert response.status_code == 200
-            data = response.get_json()
-            
-            # UTC incident should appear on previous day due to timezone conversion
-            assert '2025-08-23' in data
-            # Naive incident should appear on same day
-            assert '2025-08-23' in data
+        mock_incident_db.get_incidents_by_date_range.return_value = [utc_incident, naive_incident]
+        
+        response = client.get('/api/service/PHMCGNE/calendar?year=2025&month=8')
+        
+        assert response.status_code == 200
+        data = response.get_json()
+        
+        # UTC incident shifts back to the previous UTC-7 day; naive incident stays on its own day
+        assert list(data) == ['2025-08-23']
+        assert data['2025-08-23']['total'] == 2
+        assert data['2025-08-23']['triggered'] == 2
     
-    def test_api_service_summary_valid_request(self, client):
+    def test_api_service_summary_valid_request(self, client, mock_analytics):
         """Test service summary API with valid parameters"""
-        mock_service_metrics = ServiceMetrics(
-            service_id='PHMCGNE',
-            service_name='Test Service',
-            total_incidents=100,
-            triggered_incidents=20,
-            resolved_incidents=80,
-            escalated_incidents=15,
-            escalation_rate=15.0,
-            ccoe_resolved_incidents=10,
-            infrastructure_caused_incidents=5
-        )
+        mock_analytics.get_service_metrics_last_x_days.return_value = [_SUMMARY_METRICS]
         
-        with patch('app_v2.IncidentAnalytics') as mock_analytics_class:
-            mock_analytics = MagicMock()
-            mock_analytics.get_service_metrics_last_x_days.return_value = [mock_service_metrics]
-            mock_analytics_class.return_value = mock_analytics
-            
-            response = client.get('/api/service/PHMCGNE/summary?days=7')
-            
-            assert response.status_code == 200
-            assert response.is_json
-            
-            data = response.get_json()
-            assert data['service_id'] == 'PHMCGNE'
-            assert data['total_incidents'] == 100
-            assert data['escalation_rate'] == 15.0
+        response = client.get('/api/service/PHMCGNE/summary?days=7')
+        
+        assert response.status_code == 200
+        assert response.is_json
+        
+        data = response.get_json()
+        assert data['service_id'] == 'PHMCGNE'
+        assert data['total_incidents'] == 100
+        assert data['escalation_rate'] == 15.0
     
-    def test_api_service_summary_service_not_found(self, client):
+    def test_api_service_summary_service_not_found(self, client, mock_analytics):
         """Test service summary API when service is not found"""
-        with patch('app_v2.IncidentAnalytics') as mock_analytics_class:
-            mock_analytics = MagicMock()
-            mock_analytics.get_service_metrics_last_x_days.return_value = []  # No services found
-            mock_analytics_class.return_value = mock_analytics
-            
-            response = client.get('/api/service/NONEXISTENT/summary')
-            
-            assert response.status_code == 404
-            assert response.is_json
-            
-            data = response.get_json()
-            assert 'error' in data
+        mock_analytics.get_service_metrics_last_x_days.return_value = []  # No services found
+        
+        response = client.get('/api/service/NONEXISTENT/summary')
+        
+        assert response.status_code == 404
+        assert response.is_json
+        
+        data = response.get_json()
+        assert 'error' in data
     
-    def test_api_service_summary_default_days_parameter(self, client):
+    def test_api_service_summary_default_days_parameter(self, client, mock_analytics):
         """Test service summary API uses default days parameter"""
-        mock_service_metrics = ServiceMetrics(
-            service_id='PHMCGNE',
-            service_name='Test Service',
-            total_incidents=50,
-            triggered_incidents=10,
-            resolved_incidents=40,
-            escalated_incidents=5,
-            escalation_rate=10.0
-        )
+        mock_analytics.get_service_metrics_last_x_days.return_value = [_SUMMARY_METRICS]
         
-        with patch('app_v2.IncidentAnalytics') as mock_analytics_class:
-            mock_analytics = MagicMock()
-            mock_analytics.get_service_metrics_last_x_days.return_value = [mock_service_metrics]
-            mock_analytics_class.return_value = mock_analytics
-            
-            response = client.get('/api/service/PHMCGNE/summary')  # No days parameter
-            
-            assert response.status_code == 200
-            
-            # Should default to 7 days
-            mock_analytics.get_service_metrics_last_x_days.assert_called_with(7)
+        response = client.get('/api/service/PHMCGNE/summary')  # No days parameter
+        
+        assert response.status_code == 200
+        
+        # Should default to 7 days
+        mock_analytics.get_service_metrics_last_x_days.assert_called_with(7)
     
     def test_api_admin_update_endpoint(self, client):
         """Test admin update API endpoint"""
@@ -259,99 +303,65 @@ class TestFlaskWebApplication:
             assert data['status'] == 'started'
             assert data['pid'] == 12345
     
-    def test_load_service_config_success(self):
+    def test_load_service_config_success(self, app_module, sample_config_mock_open):
         """Test successful service configuration loading"""
-        with patch('builtins.open', mock_open(read_data=SAMPLE_CONFIG_YAML)):
-            services = load_service_config()
-            
-            expected = {
-                'PHMCGNE': {
-                    'name': 'Production Database Service',
-                    'url': 'https://company.pagerduty.com/service-directory/PHMCGNE'
-                },
-                'PABCDEF': {
-                    'name': 'Payment Processing Service',
-                    'url': 'https://company.pagerduty.com/service-directory/PABCDEF'
-                }
-            }
+        with patch('builtins.open', sample_config_mock_open):
+            services = app_module.load_service_config()
             
-            assert services == expected
+            assert services == _EXPECTED_SERVICES
     
-    def test_load_service_config_file_not_found(self):
-        """Test service config loading handles missing file"""
-        with patch('builtins.open', side_effect=FileNotFoundError("File not found")):
-            with patch('builtins.print') as mock_print:
-                services = load_service_config()
-                
-                assert services == {}
-                mock_print.assert_called()
-    
-    def test_load_service_config_invalid_yaml(self):
-        """Test service config loading handles invalid YAML"""
-        invalid_yaml = "invalid: yaml: [content"
-        
-        with patch('builtins.open', mock_open(read_data=invalid_yaml)):
-            with patch('builtins.print') as mock_print:
-                services = load_service_config()
-                
-                assert services == {}
-                mock_print.assert_called()
-    
-    def test_load_service_config_invalid_service_url(self):
-        """Test service config loading handles invalid service URLs"""
-        invalid_config = """
+    @pytest.mark.parametrize("open_patch, logs_error", [
+        # Missing file
+        ({'side_effect': FileNotFoundError("File not found")}, True),
+        # Invalid YAML
+        ({'new': mock_open(read_data="invalid: yaml: [content")}, True),
+        # Service URL without a service ID is skipped rather than treated as an error
+        ({'new': mock_open(read_data="""
 token: test_token
 services:
   - name: Invalid Service
     url: https://invalid.com/bad-url-format
-"""
+""")}, False),
+    ], ids=['file_not_found', 'invalid_yaml', 'invalid_service_url'])
+    def test_load_service_config_error(self, app_module, open_patch, logs_error):
+        """Test service config loading returns no services for missing, malformed or unusable config"""
+        with patch('builtins.open', **open_patch), patch('builtins.print') as mock_print:
+            services = app_module.load_service_config()
         
-        with patch('builtins.open', mock_open(read_data=invalid_config)):
-            with patch('builtins.print') as mock_print:
-                services = load_service_config()
-                
-                # Should skip services with invalid URLs
-                assert services == {}
+        assert services == {}
+        assert mock_print.called == logs_error
     
-    def test_utc_minus_7_timezone_constant(self):
+    def test_utc_minus_7_timezone_constant(self, app_module):
         """Test that UTC_MINUS_7 timezone constant is correctly defined"""
-        assert UTC_MINUS_7.utcoffset(None) == timedelta(hours=-7)
+        assert app_module.UTC_MINUS_7.utcoffset(None) == timedelta(hours=-7)
     
-    def test_api_service_trends_endpoint(self, client):
+    def test_api_service_trends_endpoint(self, client, mock_analytics):
         """Test service trends API endpoint"""
-        mock_daily_counts = [
-            {'date': '2025-08-23', 'total': 5, 'escalated': 1},
-            {'date': '2025-08-22', 'total': 3, 'escalated': 0},
-            {'date': '2025-08-21', 'total': 7, 'escalated': 2}
-        ]
+        mock_analytics.get_daily_incident_counts.return_value = _MOCK_DAILY_COUNTS
         
-        with patch('app_v2.IncidentAnalytics') as mock_analytics_class:
-            mock_analytics = MagicMock()
-            mock_analytics.get_daily_incident_counts.return_value = mock_daily_counts
-            mock_analytics_class.return_value = mock_analytics
-            
-            response = client.get('/api/service/PHMCGNE/trends?days=7')
-            
-            assert response.status_code == 200
-            assert response.is_json
-            
-            data = response.get_json()
-            assert isinstance(data, list)
-            assert len(data) == 3
-            assert data[0]['date'] == '2025-08-23'
-            assert data[0]['total'] == 5
-            assert data[0]['escalated'] == 1
+        response = client.get('/api/service/PHMCGNE/trends?days=7')
+        
+        assert response.status_code == 200
+        assert response.is_json
+        
+        data = response.get_json()
+        assert isinstance(data, list)
+        assert len(data) == 3
+        assert data[0]['date'] == '2025-08-23'
+        assert data[0]['total'] == 5
+        assert data[0]['escalated'] == 1
     
     def test_error_handling_in_routes(self, client):
         """Test that routes handle exceptions gracefully"""
-        # Test calendar endpoint with database error
-        with patch('app_v2.IncidentDatabase', side_effect=Exception("Database error")):
+        # Both data layers fail; patches are installed once for both requests
+        with patch('app_v2.IncidentDatabase', side_effect=Exception("Database error")), \
+             patch('app_v2.IncidentAnalytics', side_effect=Exception("Analytics error")):
+            # Calendar endpoint with database error
             response = client.get('/api/service/PHMCGNE/calendar')
             assert response.status_code == 500
             assert 'error' in response.get_json()
-        
-        # Test summary endpoint with analytics error
-        with patch('app_v2.IncidentAnalytics', side_effect=Exception("Analytics error")):
+            
+            # Summary endpoint with analytics error
             response = client.get('/api/service/PHMCGNE/summary')
             assert response.status_code == 500
             assert 'error' in response.get_json()
@@ -371,9 +381,9 @@ services:
             assert response.status_code == 200
             assert 'application/json' in response.content_type
     
-    def test_escalated_incidents_url_construction(self, client):
+    def test_escalated_incidents_url_construction(self, client, mock_incident_db):
         """Test that escalated incidents get proper PagerDuty URLs"""
-        mock_incident = MagicMock(
+        mock_incident = make_fake_incident(
             id='ESCAL123',
             title='Escalated Test',
             created_at=datetime(2025, 8, 23, 10, 0, 0, tzinfo=UTC_MINUS_7),
@@ -382,19 +392,13 @@ services:
             status='resolved',
             resolved_by_ccoe=False
         )
-        mock_incident.is_triggered_or_acknowledged.return_value = False
-        mock_incident.is_resolved.return_value = True
-        mock_incident.is_caused_by_infrastructure.return_value = False
         
-        with patch('app_v2.IncidentDatabase') as mock_db_class:
-            mock_db = MagicMock()
-            mock_db.get_incidents_by_date_range.return_value = [mock_incident]
-            mock_db_class.return_value = mock_db
-            
-            response = client.get('/api/service/PHMCGNE/calendar')
-            
-            data = response.get_json()
-            escalated_incidents = data['2025-08-23']['escalated_incidents']
-            
-            assert len(escalated_incidents) == 1
-            assert escalated_incidents[0]['html_url'] == 'https://ebay-cpt.pagerduty.com/incidents/ESCAL123'
\ No newline at end of file
+        mock_incident_db.get_incidents_by_date_range.return_value = [mock_incident]
+        
+        response = client.get('/api/service/PHMCGNE/calendar')
+        
+        data = response.get_json()
+        escalated_incidents = data['2025-08-23']['escalated_incidents']
+        
+        assert len(escalated_incidents) == 1
+        assert escalated_incidents[0]['html_url'] == 'https://ebay-cpt.pagerduty.com/incidents/ESCAL123'
\ No newline at end of file
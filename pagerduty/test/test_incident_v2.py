@@ -3,6 +3,7 @@ Tests for Incident data model (incident_v2.py)
 Tests the pure data transfer object with no external dependencies
 """
 import pytest
+import sqlite3
 from datetime import datetime, timezone, timedelta
 from freezegun import freeze_time
 
@@ -221,6 +222,14 @@ class TestIncidentDataModel:
         # UTC 00:30 on 8/24 becomes UTC-7 17:30 on 8/23
         assert date_str == '2025-08-23'
     
+    def test_get_date_str_follows_created_at_reassignment(self, sample_incident):
+        """Test the cached date string is never stale after created_at changes"""
+        assert sample_incident.get_date_str_utc_minus_7() == '2025-08-23'
+        
+        sample_incident.created_at = datetime(2025, 8, 25, 8, 0, 0, tzinfo=timezone.utc)
+        
+        assert sample_incident.get_date_str_utc_minus_7() == '2025-08-25'
+    
     def test_is_triggered_or_acknowledged(self):
         """Test status checking for triggered/acknowledged states"""
         triggered_incident = Incident(
@@ -342,4 +351,38 @@ class TestIncidentDataModel:
         assert original.priority == reconstructed.priority
         assert original.description == reconstructed.description
         assert original.resolved_by_ccoe == reconstructed.resolved_by_ccoe
-        assert original.caused_by_infra == reconstructed.caused_by_infra
\ No newline at end of file
+        assert original.caused_by_infra == reconstructed.caused_by_infra
+    
+    def test_from_row_binds_columns_by_name(self, sample_incident):
+        """Test _from_row builds an Incident from a raw cursor tuple whatever the column order"""
+        conn = sqlite3.connect(':memory:')
+        data = sample_incident.to_dict()
+        columns = list(reversed(data))  # Order differs from the dataclass field order
+        conn.execute(f"CREATE TABLE incidents ({', '.join(columns)})")
+        conn.execute(f"INSERT INTO incidents VALUES ({', '.join('?' * len(columns))})",
+                     [data[column] for column in columns])
+        
+        cursor = conn.cursor()
+        cursor.row_factory = Incident._from_row
+        incident = cursor.execute("SELECT * FROM incidents").fetchone()
+        conn.close()
+        
+        assert incident == sample_incident
+    
+    def test_from_row_without_optional_columns_uses_defaults(self, sample_incident):
+        """Test _from_row still reads a legacy column set missing resolved_by_ccoe/caused_by_infra"""
+        conn = sqlite3.connect(':memory:')
+        data = sample_incident.to_dict()
+        del data['resolved_by_ccoe'], data['caused_by_infra']
+        conn.execute(f"CREATE TABLE incidents ({', '.join(data)})")
+        conn.execute(f"INSERT INTO incidents VALUES ({', '.join('?' * len(data))})", list(data.values()))
+        
+        cursor = conn.cursor()
+        cursor.row_factory = Incident._from_row
+        incident = cursor.execute("SELECT * FROM incidents").fetchone()
+        conn.close()
+        
+        assert incident.id == sample_incident.id
+        assert incident.created_at == sample_incident.created_at
+        assert incident.resolved_by_ccoe is False
+        assert incident.caused_by_infra is None